@@ -0,0 +1,81 @@
+"""
+Multi-pattern substring counting for the dashboard's aggregate analysis.
+
+count_needles() counts every needle in every text the way str.count does
+(non-overlapping, leftmost first). With numba installed the texts are scanned
+with Boyer-Moore-Horspool over their UTF-8 bytes, which gives the same counts
+as scanning the characters; otherwise it falls back to str.count.
+"""
+
+from typing import List
+
+import numpy as np
+
+# Optional JIT; str.count is used when numba is not installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _pack(strings: List[str]):
+    """Concatenated UTF-8 bytes and the start offset of each string (plus the end)."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+if njit is not None:
+    # Serial: concurrent Streamlit sessions may call this from several
+    # threads, which numba's parallel workqueue backend aborts on
+    @njit(cache=True)
+    def _count_packed(text_buf, text_offsets, needle_buf, needle_offsets):
+        n_texts = text_offsets.shape[0] - 1
+        n_needles = needle_offsets.shape[0] - 1
+
+        # Horspool bad-character shifts, one table per needle
+        shifts = np.empty((n_needles, 256), dtype=np.int64)
+        for k in range(n_needles):
+            start = needle_offsets[k]
+            m = needle_offsets[k + 1] - start
+            shifts[k, :] = m
+            for j in range(m - 1):
+                shifts[k, needle_buf[start + j]] = m - 1 - j
+
+        counts = np.zeros((n_texts, n_needles), dtype=np.int64)
+        for t in range(n_texts):
+            begin = text_offsets[t]
+            end = text_offsets[t + 1]
+            for k in range(n_needles):
+                start = needle_offsets[k]
+                m = needle_offsets[k + 1] - start
+                if m == 0:
+                    continue
+                found = 0
+                i = begin
+                while i <= end - m:
+                    j = m - 1
+                    while j >= 0 and text_buf[i + j] == needle_buf[start + j]:
+                        j -= 1
+                    if j < 0:
+                        found += 1
+                        i += m  # Non-overlapping, as str.count
+                    else:
+                        i += shifts[k, text_buf[i + m - 1]]
+                counts[t, k] = found
+        return counts
+
+
+def count_needles(texts: List[str], needles: List[str]) -> np.ndarray:
+    """Occurrences of every (non-empty) needle in every text.
+
+    Returns:
+        int64 array of shape (len(texts), len(needles))
+    """
+    if njit is None:
+        counts = [[text.count(needle) for needle in needles] for text in texts]
+        return np.array(counts, dtype=np.int64).reshape(len(texts), len(needles))
+    text_buf, text_offsets = _pack(texts)
+    needle_buf, needle_offsets = _pack(needles)
+    return _count_packed(text_buf, text_offsets, needle_buf, needle_offsets)
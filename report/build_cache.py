@@ -0,0 +1,54 @@
+"""
+Precompute the Aggregate Analysis page's policy analyses offline.
+
+ui.py keeps the analysis of each experiment's policies.json as parquet under
+policies/.cache/ (one file per version of policies.json) and otherwise
+analyzes the policies the first time the page needs them. This script writes
+the missing files ahead of time, e.g. after a generation run, so the
+dashboard only reads parquet.
+
+Usage:
+    python build_cache.py
+    python build_cache.py --models llama3.1 --experiments 1 2
+"""
+
+import os
+import sys
+import argparse
+
+# Outside `streamlit run`, ui.py's Streamlit calls run in bare mode (no page)
+import ui
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the dashboard's policy analyses as parquet")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=ui.MODELS,
+        help="Models to analyze (default: all dashboard models)"
+    )
+    parser.add_argument(
+        "--experiments",
+        nargs="+",
+        default=ui.EXPERIMENTS,
+        help="Experiments to analyze (default: all)"
+    )
+    
+    args = parser.parse_args()
+    
+    for model in args.models:
+        for experiment in args.experiments:
+            cache_path = ui.refresh_analysis_cache(model, experiment)
+            if cache_path is None:
+                print(f"- {model} / experiment {experiment}: no policies, skipped")
+            elif os.path.exists(cache_path):
+                print(f"✓ {model} / experiment {experiment}: {os.path.relpath(cache_path)}")
+            else:
+                print(f"✗ {model} / experiment {experiment}: analysis not written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Export the compliance-rag Pinecone namespaces to local FAISS HNSW indexes.
+
+The NIST/ISO reference corpus is static and small, so it can be searched
+in-process instead of paying a Pinecone round trip per query. This script
+runs once; llmgenerator.py picks up policies/rag_index/ automatically.
+
+Output (per namespace):
+    <output>/<namespace>.faiss  - IndexHNSWFlat over L2-normalized vectors
+    <output>/<namespace>.npy    - the same normalized vectors, for the exact
+                                  numpy/numba search used when faiss is absent
+    <output>/<namespace>.json   - chunk texts truncated to the prompt chunk
+                                  size, row-aligned with the index
+
+Usage:
+    python build_local_index.py --namespaces nist iso
+"""
+
+import orjson
+import os
+import sys
+import argparse
+
+import faiss
+import numpy as np
+from pinecone import Pinecone
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+INDEX_NAME = "compliance-rag"
+HNSW_M = 32  # Graph degree: recall is near-exact at this corpus size
+CHUNK_SIZE = 200  # Same as RAGLLMPolicyGenerator.MAX_CONTEXT_LENGTH
+
+
+def export_namespace(index, namespace: str) -> tuple:
+    """Fetch every vector and its text from one Pinecone namespace."""
+    vectors, texts = [], []
+    for ids in index.list(namespace=namespace):
+        fetched = index.fetch(ids=ids, namespace=namespace)
+        for vector in fetched.vectors.values():
+            vectors.append(vector.values)
+            texts.append((vector.metadata or {}).get('text', '')[:CHUNK_SIZE])
+    return np.asarray(vectors, dtype=np.float32), texts
+
+
+def build_hnsw_index(vectors: np.ndarray):
+    """Build an inner-product HNSW index (cosine on normalized vectors)."""
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexHNSWFlat(vectors.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.add(vectors)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Pinecone namespaces to local FAISS indexes")
+    parser.add_argument(
+        "--namespaces",
+        nargs="+",
+        default=["nist", "iso"],
+        help="Namespaces to export (default: nist iso)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "policies", "rag_index"),
+        help="Output directory (default: ./policies/rag_index)"
+    )
+    
+    args = parser.parse_args()
+    
+    load_dotenv()
+    api_key = os.getenv("PINECONE_API_KEY")
+    if not api_key:
+        print("ERROR: PINECONE_API_KEY not found in .env")
+        sys.exit(1)
+    
+    index = Pinecone(api_key=api_key).Index(INDEX_NAME)
+    os.makedirs(args.output, exist_ok=True)
+    
+    for namespace in args.namespaces:
+        vectors, texts = export_namespace(index, namespace)
+        if not texts:
+            print(f"✗ Namespace '{namespace}' is empty, skipped")
+            continue
+        
+        faiss.write_index(
+            build_hnsw_index(vectors),
+            os.path.join(args.output, f"{namespace}.faiss")
+        )
+        np.save(os.path.join(args.output, f"{namespace}.npy"), vectors)
+        with open(os.path.join(args.output, f"{namespace}.json"), 'wb') as f:
+            f.write(orjson.dumps(texts))
+        
+        print(f"✓ {namespace}: {len(texts)} vectors")
+    
+    print(f"\nLocal index written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
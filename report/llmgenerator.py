@@ -28,22 +28,73 @@ CHANGES FOR REPRODUCIBILITY & FAIRNESS:
    - Common timeout for Exp1: 300s (fair baseline)
    - Common chunk size: 200 chars
    - Common RAG top_k: 2
+
+5. CONCURRENCY (opt-in, set the same values for the Ollama server and this script):
+   - OLLAMA_NUM_PARALLEL=4        -> up to 4 concurrent requests per model
+   - OLLAMA_MAX_LOADED_MODELS=3   -> all models generate side by side
+   - Both default to 1 here so latencies stay comparable across models
 """
 
-import json
+import orjson
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Tuple
 import os
 import time
 import sys
-from datetime import datetime
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone
 from dotenv import load_dotenv
 
+# gRPC transport (pip install "pinecone[grpc]") multiplexes the concurrent
+# prefetch queries over one HTTP/2 connection; REST client otherwise
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+except ImportError:
+    from pinecone import Pinecone
+
+# Optional JIT for exact top-k search when FAISS is not installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 
+def _cosine_scores(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Dot product of every (unit) corpus row with a unit query."""
+    return matrix @ query
+
+
+if njit is not None:
+    # Serial on purpose: the corpus is a few hundred rows, and the prefetch
+    # pool calls this from many threads at once, which numba's parallel
+    # workqueue backend aborts on
+    @njit(fastmath=True, cache=True)
+    def _cosine_scores(query, matrix):
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for row in range(matrix.shape[0]):
+            acc = np.float32(0.0)
+            for col in range(matrix.shape[1]):
+                acc += matrix[row, col] * query[col]
+            scores[row] = acc
+        return scores
+
+
+def _topk_cosine(matrix: np.ndarray, query: np.ndarray, top_k: int) -> np.ndarray:
+    """Row indices of the top_k most similar corpus rows, best first."""
+    scores = _cosine_scores(query, matrix)
+    top_k = min(top_k, scores.shape[0])
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    return top[np.argsort(-scores[top])]
+
+
 class RAGLLMPolicyGenerator:
     """RAG-enhanced LLM policy generator with reproducibility guarantees."""
     
@@ -62,21 +113,58 @@ class RAGLLMPolicyGenerator:
         "gpt-oss:20b": 300,         # 5 min (standard model)
     }
     
-    REQUEST_DELAY = 1.0
+    REQUEST_DELAY = 1.0        # Back-off after Ollama reports it is overloaded
     EXPERIMENT_DELAY = 10.0
     MAX_CONTEXT_LENGTH = 200  # Standardized chunk size
     RAG_TOP_K = 2              # Standardized RAG retrieval count
+    RAG_NAMESPACES = ("nist", "iso")
+    RAG_QUERY_WORKERS = 16     # Concurrent Pinecone queries during prefetch
+    EMBED_BATCH_SIZE = 64      # Queries per embedder forward pass
+    RAG_DEDUP_SIMILARITY = 0.98  # Near-duplicate queries share retrieved context
+    OLLAMA_KEEP_ALIVE = "30m"  # Keep the model resident between calls
+    HTTP_POOL_SIZE = 16        # Pooled connections to the Ollama endpoint
+    EMBEDDER_MODEL = "all-MiniLM-L6-v2"
+    ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"  # Runs on any AVX2 CPU
     
     def __init__(
         self, 
         ollama_endpoint: str, 
         reference_policies_file: str, 
         output_dir: str, 
-        pinecone_api_key: str, 
-        limit_per_model: int = 20
+        pinecone_api_key: Optional[str], 
+        limit_per_model: int = 20,
+        local_index_dir: Optional[str] = None,
+        request_delay: float = 0.0,
+        num_parallel: int = 1,
+        response_cache_similarity: Optional[float] = None,
+        onnx_int8_embedder: bool = False
     ):
-        """Initialize the RAG-enhanced policy generator."""
+        """
+        Initialize the RAG-enhanced policy generator.
+        
+        If local_index_dir holds FAISS indexes exported by build_local_index.py,
+        retrieval runs in-process and Pinecone is not contacted.
+        request_delay spaces Ollama calls at least that many seconds apart,
+        across all models and workers (e.g. for a shared remote endpoint);
+        a local Ollama server needs none.
+        num_parallel should match the server's OLLAMA_NUM_PARALLEL.
+        response_cache_similarity (e.g. 0.86) lets a policy reuse the response
+        generated for a near-duplicate vulnerability by the same model and
+        experiment instead of calling Ollama. Off by default: reused
+        responses are not independent model outputs.
+        onnx_int8_embedder runs MiniLM through ONNX Runtime with int8 weights
+        when no GPU is available (requires requirements-onnx.txt, i.e.
+        sentence-transformers[onnx]>=3.2).
+        """
         self.ollama_endpoint = ollama_endpoint
+        self.request_delay = request_delay
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+        # Set on Ctrl-C: model runs stop submitting and exit after the
+        # in-flight requests are checkpointed
+        self.stop_requested = threading.Event()
+        self.num_parallel = max(1, num_parallel)
+        self.response_cache_similarity = response_cache_similarity
         self.output_dir = output_dir
         self.limit_per_model = limit_per_model
         
@@ -86,23 +174,182 @@ class RAGLLMPolicyGenerator:
         self.reference_policies = dict(sorted_items)
         
         # Initialize RAG components with fixed seed for reproducibility
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.embedder_name = self.EMBEDDER_MODEL
+        if device == 'cpu' and onnx_int8_embedder:
+            # Dynamically quantized export shipped with the model on the Hub
+            self.embedder = SentenceTransformer(
+                self.EMBEDDER_MODEL, 
+                device=device, 
+                backend="onnx", 
+                model_kwargs={"file_name": self.ONNX_INT8_FILE}
+            )
+            self.embedder_name += " (onnx-int8)"
+        else:
+            self.embedder = SentenceTransformer(self.EMBEDDER_MODEL, device=device)
+        if device == 'cuda':
+            # fp16 halves memory traffic; ample precision for top-k retrieval
+            self.embedder = self.embedder.half()
+            self.embedder_name += " (fp16)"
         # Note: SentenceTransformer uses PyTorch internally, seed set in main()
         
-        pc = Pinecone(api_key=pinecone_api_key)
-        self.index = pc.Index("compliance-rag")
+        # Queries are deterministic per policy: encode them all in one batch
+        self._query_embeddings = self._precompute_query_embeddings()
+        self._query_rows = {
+            vuln_id: row for row, vuln_id in enumerate(self.reference_policies)
+        }
+        self._canonical_queries = self._group_near_duplicate_queries()
+        
+        if local_index_dir:
+            self._local_indexes = self._load_local_indexes(local_index_dir)
+            self.index = None
+        else:
+            self._local_indexes = {}
+            pc = Pinecone(api_key=pinecone_api_key)
+            self.index = pc.Index("compliance-rag")
+            self.vector_store = "pinecone/compliance-rag"
+        
+        # Persistent HTTP session: reuse the TCP connection to Ollama. The pool
+        # holds one connection per concurrent request; only failed connects are
+        # retried (POST generations are never replayed after a read error)
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(
+            pool_connections=self.HTTP_POOL_SIZE,
+            pool_maxsize=self.HTTP_POOL_SIZE,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
         
         os.makedirs(output_dir, exist_ok=True)
         
         # Tracking for fairness report
         self.experiment_stats = {}
         
+        # RAG results are identical across experiments: (vuln_id, namespace, top_k) -> chunks
+        self._context_cache: Dict[Tuple[str, str, int], List[str]] = {}
+        # Prompt inputs per vuln_id, shared by every model and experiment
+        self._base_prompt_cache: Dict[str, Tuple[str, List[str], List[str]]] = {}
+        # Experiment 1 prompts are identical for all models: vuln_id -> prompt
+        self._std_prompt_cache: Dict[str, str] = {}
+        
         print(f"✓ Loaded {len(self.reference_policies)} vulnerabilities (sorted)")
     
     def _load_policies(self, file_path: str) -> Dict:
         """Load policies from JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    def _load_local_indexes(self, index_dir: str) -> Dict[str, tuple]:
+        """
+        Load per-namespace local indexes and their chunk texts.
+        
+        Uses the FAISS HNSW index when faiss is installed, otherwise an exact
+        top-k scan over the exported vector matrix (numba-compiled if available).
+        
+        Returns:
+            namespace -> (search(query, top_k) -> row ids, texts)
+        """
+        try:
+            import faiss
+        except ImportError:
+            faiss = None
+        
+        indexes = {}
+        for namespace in self.RAG_NAMESPACES:
+            path = os.path.join(index_dir, namespace)
+            if faiss is not None:
+                index = faiss.read_index(f"{path}.faiss")
+                search = lambda query, top_k, index=index: index.search(query[None, :], top_k)[1][0]
+            else:
+                matrix = np.ascontiguousarray(np.load(f"{path}.npy"), dtype=np.float32)
+                search = lambda query, top_k, matrix=matrix: _topk_cosine(matrix, query, top_k)
+            with open(f"{path}.json", 'rb') as f:
+                # Truncate once here rather than on every query (no-op for
+                # indexes exported already truncated)
+                texts = [
+                    text[:self.MAX_CONTEXT_LENGTH] 
+                    for text in orjson.loads(f.read())
+                ]
+            indexes[namespace] = (search, texts)
+        
+        self.vector_store = (
+            "faiss-hnsw/compliance-rag" if faiss is not None else "exact-cosine/compliance-rag"
+        )
+        print(f"✓ Local RAG index ({self.vector_store}): {index_dir}")
+        return indexes
+    
+    def _append_jsonl(self, f, record: Dict):
+        """Append one record to a JSON Lines checkpoint and flush it to disk."""
+        f.write(orjson.dumps(record) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    
+    def _write_policies_json(self, path: str, policies: Dict[str, str]):
+        """
+        Write policies as an indented JSON object, one entry at a time.
+        
+        Produces the same bytes as orjson.dumps(policies, OPT_INDENT_2) without
+        holding the whole multi-MB document in memory.
+        """
+        with open(path, 'wb') as f:
+            f.write(b'{')
+            for i, (vuln_id, policy) in enumerate(policies.items()):
+                f.write(b',\n  ' if i else b'\n  ')
+                f.write(orjson.dumps(vuln_id))
+                f.write(b': ')
+                f.write(orjson.dumps(policy))
+            f.write(b'\n}' if policies else b'}')
+    
+    def _read_jsonl(self, path: str) -> List[Dict]:
+        """
+        Read the records of a JSON Lines checkpoint.
+        
+        A final line torn by a kill or power loss mid-append is dropped with a
+        warning and truncated away, so appends on resume start on a new line.
+        """
+        records = []
+        with open(path, 'rb+') as f:
+            lines = f.readlines()
+            offset = 0
+            for i, line in enumerate(lines):
+                if line.strip():
+                    try:
+                        records.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        if i < len(lines) - 1:
+                            raise
+                        print(f"✗ Dropping incomplete last line of {path}")
+                        f.truncate(offset)
+                        break
+                offset += len(line)
+            else:
+                if lines and not lines[-1].endswith(b"\n"):
+                    f.write(b"\n")  # Complete record cut just before its newline
+        return records
+    
+    def _load_checkpoint(
+        self, 
+        policies_log: str, 
+        metadata_log: str
+    ) -> tuple[Dict[str, str], Dict[str, Dict]]:
+        """
+        Load policies generated by an interrupted run.
+        
+        Returns:
+            (generated_policies, processed records of those policies)
+        """
+        generated_policies = {}
+        if os.path.exists(policies_log):
+            for record in self._read_jsonl(policies_log):
+                generated_policies.update(record)
+        
+        # Failed attempts are retried, so only successful records are kept
+        processed = {}
+        if os.path.exists(metadata_log):
+            for record in self._read_jsonl(metadata_log):
+                if record["vuln_id"] in generated_policies:
+                    processed[record["vuln_id"]] = record
+        
+        return generated_policies, processed
     
     def _get_model_output_dir(self, model: str, experiment: str) -> str:
         """Create and return experiment-specific output directory."""
@@ -128,9 +375,84 @@ class RAGLLMPolicyGenerator:
                     return timeout
             return self.EXPERIMENT_1_TIMEOUT
     
+    def _build_query(self, policy: Dict) -> str:
+        """Build the RAG query string for a policy."""
+        return " ".join([
+            policy.get('title', ''),
+            policy.get('severity', ''),
+            policy.get('description', '')
+        ]).strip()
+    
+    def _precompute_query_embeddings(self) -> np.ndarray:
+        """Encode all policy queries in a single batched embedder call.
+        
+        Returns an (N, dim) float32 matrix in reference_policies order;
+        rows are L2-normalized, which leaves cosine ranking unchanged.
+        """
+        queries = [
+            self._build_query(policy) 
+            for policy in self.reference_policies.values()
+        ]
+        embeddings = self.embedder.encode(
+            queries,
+            batch_size=self.EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _group_near_duplicate_queries(self) -> Dict[str, str]:
+        """
+        Map each vuln_id to the first vuln_id whose query embedding is a
+        near-duplicate (cosine >= RAG_DEDUP_SIMILARITY).
+        
+        Near-identical queries retrieve the same top-k chunks, so they can
+        share one vector store lookup. Assignment follows the sorted policy
+        order, which keeps it deterministic.
+        """
+        vuln_ids = list(self.reference_policies)
+        similarity = self._query_embeddings @ self._query_embeddings.T
+        
+        canonical = {}
+        representatives = []
+        for row, vuln_id in enumerate(vuln_ids):
+            match = next(
+                (r for r in representatives 
+                 if similarity[row, r] >= self.RAG_DEDUP_SIMILARITY),
+                None
+            )
+            if match is None:
+                representatives.append(row)
+                match = row
+            canonical[vuln_id] = vuln_ids[match]
+        
+        duplicates = len(vuln_ids) - len(representatives)
+        if duplicates:
+            print(f"✓ {duplicates} near-duplicate RAG queries will reuse context")
+        return canonical
+    
+    def _find_cached_response(
+        self, 
+        vuln_id: str, 
+        cached_ids: List[str]
+    ) -> Optional[str]:
+        """
+        Return the cached vuln_id whose query is most similar to vuln_id's,
+        or None when the semantic response cache is off or nothing is close
+        enough (cosine < response_cache_similarity).
+        """
+        if not self.response_cache_similarity or not cached_ids:
+            return None
+        
+        rows = [self._query_rows[cached_id] for cached_id in cached_ids]
+        scores = self._query_embeddings[rows] @ self._query_embeddings[self._query_rows[vuln_id]]
+        best = int(np.argmax(scores))
+        return cached_ids[best] if scores[best] >= self.response_cache_similarity else None
+    
     def retrieve_context(
         self, 
-        policy: Dict, 
+        vuln_id: str, 
         namespace: str, 
         top_k: int = None
     ) -> List[str]:
@@ -138,19 +460,37 @@ class RAGLLMPolicyGenerator:
         if top_k is None:
             top_k = self.RAG_TOP_K
         
-        query = " ".join([
-            policy.get('title', ''),
-            policy.get('severity', ''),
-            policy.get('description', '')
-        ]).strip()
+        # Near-duplicate queries are resolved to one representative lookup
+        vuln_id = self._canonical_queries[vuln_id]
+        cache_key = (vuln_id, namespace, top_k)
+        if cache_key in self._context_cache:
+            return self._context_cache[cache_key]
         
-        query_embedding = self.embedder.encode(query).tolist()
+        query_embedding = self._query_embeddings[self._query_rows[vuln_id]]
+        
+        if self._local_indexes:
+            context = self._query_local_index(query_embedding, namespace, top_k)
+        else:
+            context = self._query_pinecone(query_embedding, namespace, top_k)
         
+        self._context_cache[cache_key] = context
+        return context
+    
+    def _query_pinecone(
+        self, 
+        query_embedding: np.ndarray, 
+        namespace: str, 
+        top_k: int
+    ) -> List[str]:
+        """Query the hosted Pinecone index."""
+        # Only metadata text is used: never ship the stored vectors back.
+        # Pinecone's client validates vectors as plain lists of floats.
         results = self.index.query(
-            vector=query_embedding,
+            vector=query_embedding.tolist(),
             top_k=top_k,
             namespace=namespace,
-            include_metadata=True
+            include_metadata=True,
+            include_values=False
         )
         
         return [
@@ -158,6 +498,40 @@ class RAGLLMPolicyGenerator:
             for m in results['matches']
         ]
     
+    def _query_local_index(
+        self, 
+        query_embedding: np.ndarray, 
+        namespace: str, 
+        top_k: int
+    ) -> List[str]:
+        """Query the in-process index (inner product on unit vectors)."""
+        search, texts = self._local_indexes[namespace]
+        
+        return [texts[i] for i in search(query_embedding, top_k) if i >= 0]
+    
+    def _prefetch_contexts(self):
+        """Fan out every (vuln_id, namespace) lookup to fill the context cache."""
+        with ThreadPoolExecutor(max_workers=self.RAG_QUERY_WORKERS) as pool:
+            futures = [
+                pool.submit(self.retrieve_context, vuln_id, namespace, self.RAG_TOP_K)
+                for vuln_id in self.reference_policies
+                for namespace in self.RAG_NAMESPACES
+            ]
+            for future in futures:
+                future.result()
+    
+    def _wait_for_request_slot(self):
+        """Block until the shared rate limit (one call per request_delay) allows a call."""
+        if not self.request_delay:
+            return
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            wait_seconds = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.request_delay
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+    
     def call_ollama(
         self, 
         model: str, 
@@ -170,35 +544,38 @@ class RAGLLMPolicyGenerator:
         Returns:
             (response_text, duration_seconds, success)
         """
-        start_time = time.time()
+        self._wait_for_request_slot()
+        start_time = time.monotonic()
         
         try:
-            print(f"(timeout: {timeout}s)", end=" ", flush=True)
-            
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ollama_endpoint}/api/generate",
                 json={
                     "model": model, 
                     "prompt": prompt, 
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": self.OLLAMA_KEEP_ALIVE
                 },
                 timeout=timeout
             )
             
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
             
             if response.status_code == 200:
-                return response.json().get("response", ""), duration, True
+                return orjson.loads(response.content).get("response", ""), duration, True
             else:
                 print(f"\n  ✗ API error: {response.status_code}")
+                if response.status_code in (429, 503):
+                    # Server is saturated: give it a moment before the next call
+                    time.sleep(self.REQUEST_DELAY)
                 return None, duration, False
                 
         except requests.exceptions.Timeout:
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
             print(f"\n  ✗ Timeout after {timeout}s")
             return None, duration, False
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
             print(f"\n  ✗ Error: {str(e)[:50]}")
             return None, duration, False
     
@@ -225,7 +602,7 @@ class RAGLLMPolicyGenerator:
         if not items:
             return f"{title}:\n• No relevant context found" if title else "• No relevant context found"
         
-        formatted_items = "\n".join([f"• {item}" for item in items])
+        formatted_items = "• " + "\n• ".join(items)
         return f"{title}:\n{formatted_items}" if title else formatted_items
     
     def _create_base_prompt(
@@ -233,17 +610,55 @@ class RAGLLMPolicyGenerator:
         vuln_id: str, 
         policy: Dict
     ) -> tuple:
-        """Create base prompt components with RAG context."""
+        """Create base prompt components with RAG context (memoized per vuln_id)."""
+        if vuln_id in self._base_prompt_cache:
+            return self._base_prompt_cache[vuln_id]
+        
         vuln_data = self._format_vuln_data(vuln_id, policy)
-        nist_context = self.retrieve_context(policy, 'nist', top_k=self.RAG_TOP_K)
-        iso_context = self.retrieve_context(policy, 'iso', top_k=self.RAG_TOP_K)
         
-        return vuln_data, nist_context, iso_context
+        # Normally both contexts were prefetched (_prefetch_contexts)
+        canonical_id = self._canonical_queries[vuln_id]
+        nist_context = self._context_cache.get((canonical_id, 'nist', self.RAG_TOP_K))
+        iso_context = self._context_cache.get((canonical_id, 'iso', self.RAG_TOP_K))
+        if nist_context is None or iso_context is None:
+            # NIST and ISO lookups are independent network calls: run them concurrently
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                nist_future = pool.submit(
+                    self.retrieve_context, vuln_id, 'nist', self.RAG_TOP_K
+                )
+                iso_future = pool.submit(
+                    self.retrieve_context, vuln_id, 'iso', self.RAG_TOP_K
+                )
+                nist_context = nist_future.result()
+                iso_context = iso_future.result()
+        
+        base = (vuln_data, nist_context, iso_context)
+        self._base_prompt_cache[vuln_id] = base
+        return base
     
     # ==========================================================================
     # EXPERIMENT 1: STANDARDIZED PROMPT (IDENTICAL FOR ALL MODELS)
     # ==========================================================================
     
+    # Static prompt text is built once at import; only policy data is joined in.
+    # All static text comes first so Ollama's prompt cache can reuse the KV
+    # state of the shared prefix; policy-specific data is appended last.
+    _STANDARDIZED_PREFIX = (
+        "You are a security policy expert using NIST CSF 2.0 and ISO 27001:2022.\n\n"
+        "Generate a security policy with the following structure:\n\n"
+        "Title: [Severity] - [Vuln ID]\n"
+        "Scope: Affected systems\n"
+        "Risk: Impact description\n"
+        "Controls: Map to NIST/ISO guidance below\n"
+        "Remediation: Specific actions with timeline\n"
+        "Verification: Confirmation method\n\n"
+        "Requirements:\n"
+        "- Cite specific framework sections\n"
+        "- Keep response under 250 words\n"
+        "- Be precise and actionable\n\n"
+        "Vulnerability:\n"
+    )
+    
     def _create_standardized_prompt(
         self, 
         vuln_id: str, 
@@ -255,63 +670,30 @@ class RAGLLMPolicyGenerator:
         This prompt is IDENTICAL for all models to ensure fair comparison.
         No model-specific optimizations applied.
         """
+        if vuln_id in self._std_prompt_cache:
+            return self._std_prompt_cache[vuln_id]
+        
         vuln_data, nist, iso = self._create_base_prompt(vuln_id, policy)
         
-        return (
-            "You are a security policy expert using NIST CSF 2.0 and ISO 27001:2022.\n\n"
-            f"Vulnerability:\n{vuln_data}\n\n"
-            f"{self._build_context_section('NIST Guidance', nist)}\n\n"
-            f"{self._build_context_section('ISO Controls', iso)}\n\n"
-            "Generate a security policy with the following structure:\n\n"
-            "Title: [Severity] - [Vuln ID]\n"
-            "Scope: Affected systems\n"
-            "Risk: Impact description\n"
-            "Controls: Map to NIST/ISO guidance above\n"
-            "Remediation: Specific actions with timeline\n"
-            "Verification: Confirmation method\n\n"
-            "Requirements:\n"
-            "- Cite specific framework sections\n"
-            "- Keep response under 250 words\n"
-            "- Be precise and actionable"
-        )
+        prompt = "".join((
+            self._STANDARDIZED_PREFIX,
+            vuln_data,
+            "\n\n",
+            self._build_context_section('NIST Guidance', nist),
+            "\n\n",
+            self._build_context_section('ISO Controls', iso)
+        ))
+        self._std_prompt_cache[vuln_id] = prompt
+        return prompt
     
     # ==========================================================================
     # EXPERIMENT 2: MODEL-TAILORED PROMPTS (CORRECTED FORMATS)
     # ==========================================================================
     
-    def _create_tailored_prompt_llama31(
-        self, 
-        vuln_id: str, 
-        policy: Dict
-    ) -> str:
-        """
-        Experiment 2: Llama 3.1 optimized WITH CORRECT SPECIAL TOKENS.
-        
-        ✅ FIXED: Now uses proper Llama 3.1 chat format:
-        - <|begin_of_text|> to start
-        - <|start_header_id|>system<|end_header_id|> for system message
-        - <|eot_id|> to end each turn
-        - <|start_header_id|>user<|end_header_id|> for user message
-        - <|start_header_id|>assistant<|end_header_id|> to prompt response
-        
-        DIFFERENCES FROM BASELINE:
-        - Uses proper chat template format
-        - Markdown headers for structure
-        - Explicit bullet point formatting
-        - Scannable sections
-        """
-        vuln_data, nist, iso = self._create_base_prompt(vuln_id, policy)
-        
-        system_msg = "You are a security policy expert. Use NIST CSF 2.0 and ISO 27001:2022."
-        
-        user_msg = f"""### Vulnerability Details
-{vuln_data}
+    # Proper Llama 3.1 chat template format (static task text before the data)
+    _LLAMA_PREFIX = """<|begin_of_text|><|start_header_id|>system<|end_header_id|>
 
-### NIST CSF 2.0 Guidance
-{self._build_context_section('', nist)}
-
-### ISO 27001:2022 Controls
-{self._build_context_section('', iso)}
+You are a security policy expert. Use NIST CSF 2.0 and ISO 27001:2022.<|eot_id|><|start_header_id|>user<|end_header_id|>
 
 ### Task
 Generate a structured security policy following this exact format:
@@ -327,7 +709,7 @@ Generate a structured security policy following this exact format:
 - Note business consequences
 
 **Controls:**
-- Map each control to NIST/ISO guidance above
+- Map each control to NIST/ISO guidance below
 - Use format: [Framework Section] - [Control Description]
 
 **Remediation:**
@@ -343,40 +725,56 @@ Requirements:
 - Make each section scannable
 - Cite specific framework sections (e.g., NIST PR.DS-2, ISO A.9.4.1)
 - Keep under 250 words total
-- Be concrete and actionable"""
-        
-        # Proper Llama 3.1 chat template format
-        return f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+- Be concrete and actionable
 
-{system_msg}<|eot_id|><|start_header_id|>user<|end_header_id|>
+### Vulnerability Details
+"""
+    _LLAMA_NIST_HEADER = """
 
-{user_msg}<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+### NIST CSF 2.0 Guidance
+"""
+    _LLAMA_ISO_HEADER = """
+
+### ISO 27001:2022 Controls
+"""
+    _LLAMA_SUFFIX = """<|eot_id|><|start_header_id|>assistant<|end_header_id|>
 
 """
     
-    def _create_tailored_prompt_deepseek(
+    def _create_tailored_prompt_llama31(
         self, 
         vuln_id: str, 
         policy: Dict
     ) -> str:
         """
-        Experiment 2: DeepSeek R1 optimized WITH CORRECT REASONING FORMAT.
+        Experiment 2: Llama 3.1 optimized WITH CORRECT SPECIAL TOKENS.
         
-        ✅ FIXED: Now uses proper DeepSeek R1 format:
-        - Clear system instruction for reasoning model
-        - Structured with <think> tags for chain-of-thought
-        - Simplified to reduce reasoning overhead
-        - Explicit request to explain relevance
+        ✅ FIXED: Now uses proper Llama 3.1 chat format:
+        - <|begin_of_text|> to start
+        - <|start_header_id|>system<|end_header_id|> for system message
+        - <|eot_id|> to end each turn
+        - <|start_header_id|>user<|end_header_id|> for user message
+        - <|start_header_id|>assistant<|end_header_id|> to prompt response
         
         DIFFERENCES FROM BASELINE:
-        - Designed for reasoning model architecture
-        - Shorter word limit (200 vs 250) 
-        - Focus on "most critical controls only"
-        - More direct, less verbose structure
+        - Uses proper chat template format
+        - Markdown headers for structure
+        - Explicit bullet point formatting
+        - Scannable sections
         """
         vuln_data, nist, iso = self._create_base_prompt(vuln_id, policy)
         
-        return f"""You are DeepSeek R1, a reasoning model specialized in security policy generation.
+        return "".join((
+            self._LLAMA_PREFIX,
+            vuln_data,
+            self._LLAMA_NIST_HEADER,
+            self._build_context_section('', nist),
+            self._LLAMA_ISO_HEADER,
+            self._build_context_section('', iso),
+            self._LLAMA_SUFFIX
+        ))
+    
+    _DEEPSEEK_PREFIX = """You are DeepSeek R1, a reasoning model specialized in security policy generation.
 
 TASK: Generate a security policy using NIST CSF 2.0 and ISO 27001:2022.
 
@@ -387,15 +785,6 @@ First, analyze the vulnerability:
 - What are the critical remediation steps?
 </think>
 
-VULNERABILITY DATA:
-{vuln_data}
-
-NIST CSF 2.0 GUIDANCE:
-{self._build_context_section('', nist)}
-
-ISO 27001:2022 CONTROLS:
-{self._build_context_section('', iso)}
-
 Create a policy with these sections:
 
 Title: [Severity] - [Vuln ID]
@@ -405,7 +794,7 @@ Scope: List affected systems
 Risk: Describe impact in 1-2 sentences
 
 Controls: 
-- Map 2-3 MOST CRITICAL controls from the guidance above
+- Map 2-3 MOST CRITICAL controls from the guidance below
 - Format: [Framework ID] - [Brief description]
 - Explain why each control is relevant to THIS vulnerability
 
@@ -420,45 +809,55 @@ Requirements:
 - Cite framework sections (e.g., NIST PR.DS-2, ISO A.9.4.1)
 - Be concise: under 200 words
 - Focus on the most critical controls only
-- Be actionable and specific"""
+- Be actionable and specific
+
+VULNERABILITY DATA:
+"""
+    _DEEPSEEK_NIST_HEADER = """
+
+NIST CSF 2.0 GUIDANCE:
+"""
+    _DEEPSEEK_ISO_HEADER = """
+
+ISO 27001:2022 CONTROLS:
+"""
     
-    def _create_tailored_prompt_gptoss(
+    def _create_tailored_prompt_deepseek(
         self, 
         vuln_id: str, 
         policy: Dict
     ) -> str:
         """
-        Experiment 2: GPT-OSS optimized WITH CORRECT HARMONY FORMAT.
+        Experiment 2: DeepSeek R1 optimized WITH CORRECT REASONING FORMAT.
         
-        ✅ FIXED: Now uses proper Harmony framework format:
-        - Role-based structure (developer/system)
-        - Enhanced business context framing
-        - Longer word limit (300 vs 250) to leverage context handling
-        - Additional sections (Contingency Planning)
-        - Balancing technical + business clarity
+        ✅ FIXED: Now uses proper DeepSeek R1 format:
+        - Clear system instruction for reasoning model
+        - Structured with <think> tags for chain-of-thought
+        - Simplified to reduce reasoning overhead
+        - Explicit request to explain relevance
         
         DIFFERENCES FROM BASELINE:
-        - Uses Harmony role markers
-        - Senior Security Compliance Officer role
-        - Business-focused language
-        - Extended structure with contingency planning
+        - Designed for reasoning model architecture
+        - Shorter word limit (200 vs 250) 
+        - Focus on "most critical controls only"
+        - More direct, less verbose structure
         """
         vuln_data, nist, iso = self._create_base_prompt(vuln_id, policy)
         
-        # Harmony format with explicit role markers
-        return f"""<|role:developer|>
+        return "".join((
+            self._DEEPSEEK_PREFIX,
+            vuln_data,
+            self._DEEPSEEK_NIST_HEADER,
+            self._build_context_section('', nist),
+            self._DEEPSEEK_ISO_HEADER,
+            self._build_context_section('', iso)
+        ))
+    
+    # Harmony format with explicit role markers
+    _GPTOSS_PREFIX = """<|role:developer|>
 You are a Senior Security Compliance Officer at a Fortune 500 company preparing a security policy for executive review. Your audience includes both technical teams and C-suite executives.
 <|role:system|>
 
-=== VULNERABILITY ASSESSMENT ===
-{vuln_data}
-
-=== NIST CSF 2.0 GUIDANCE ===
-{self._build_context_section('', nist)}
-
-=== ISO 27001:2022 CONTROLS ===
-{self._build_context_section('', iso)}
-
 === POLICY REQUIREMENTS ===
 
 Create a security policy that balances technical precision with business clarity.
@@ -479,7 +878,7 @@ Risk:
 - Quantify potential cost/downtime if possible
 
 Controls:
-- Map to NIST/ISO guidance above with specific citations
+- Map to NIST/ISO guidance below with specific citations
 - Explain how each control mitigates risk
 - Include compensating controls if needed
 - Note dependencies between controls
@@ -509,12 +908,61 @@ Requirements:
 - Provide clear accountability and timelines
 - Cite specific framework sections (e.g., NIST PR.DS-2, ISO A.9.4.1)
 - Keep under 300 words while maintaining completeness
-- Use professional, confident tone suitable for executive review"""
+- Use professional, confident tone suitable for executive review
+
+=== VULNERABILITY ASSESSMENT ===
+"""
+    _GPTOSS_NIST_HEADER = """
+
+=== NIST CSF 2.0 GUIDANCE ===
+"""
+    _GPTOSS_ISO_HEADER = """
+
+=== ISO 27001:2022 CONTROLS ===
+"""
+    
+    def _create_tailored_prompt_gptoss(
+        self, 
+        vuln_id: str, 
+        policy: Dict
+    ) -> str:
+        """
+        Experiment 2: GPT-OSS optimized WITH CORRECT HARMONY FORMAT.
+        
+        ✅ FIXED: Now uses proper Harmony framework format:
+        - Role-based structure (developer/system)
+        - Enhanced business context framing
+        - Longer word limit (300 vs 250) to leverage context handling
+        - Additional sections (Contingency Planning)
+        - Balancing technical + business clarity
+        
+        DIFFERENCES FROM BASELINE:
+        - Uses Harmony role markers
+        - Senior Security Compliance Officer role
+        - Business-focused language
+        - Extended structure with contingency planning
+        """
+        vuln_data, nist, iso = self._create_base_prompt(vuln_id, policy)
+        
+        return "".join((
+            self._GPTOSS_PREFIX,
+            vuln_data,
+            self._GPTOSS_NIST_HEADER,
+            self._build_context_section('', nist),
+            self._GPTOSS_ISO_HEADER,
+            self._build_context_section('', iso)
+        ))
     
     # ==========================================================================
     # GENERATION LOGIC WITH MINIMAL LOGGING
     # ==========================================================================
     
+    def _iter_prompts(self, prompt_method, skip: Dict[str, str]):
+        """Lazily yield (vuln_id, prompt) for policies not in skip."""
+        for vuln_id, policy in self.reference_policies.items():
+            if vuln_id not in skip:
+                yield vuln_id, prompt_method(vuln_id, policy)
+    
     def _generate_policies(
         self, 
         model: str, 
@@ -523,25 +971,32 @@ Requirements:
     ) -> Dict[str, str]:
         """Core generation loop with metadata tracking."""
         output_dir = self._get_model_output_dir(model, experiment)
-        generated_policies = {}
         total = len(self.reference_policies)
         timeout = self._get_timeout_for_experiment(model, experiment)
         
+        # Wall clock is read once; the end time is derived from a monotonic
+        # delta so clock adjustments cannot skew the recorded run length
+        run_start_wall = datetime.now()
+        run_start = time.monotonic()
+        
         # Initialize metadata
         metadata = {
             "model": model,
             "experiment": experiment,
-            "start_time": datetime.now().isoformat(),
+            "start_time": run_start_wall.isoformat(),
             "timeout_seconds": timeout,
             "rag_config": {
                 "top_k": self.RAG_TOP_K,
                 "chunk_size": self.MAX_CONTEXT_LENGTH,
-                "embedder": "all-MiniLM-L6-v2",
-                "vector_store": "pinecone/compliance-rag"
+                "dedup_similarity": self.RAG_DEDUP_SIMILARITY,
+                "embedder": self.embedder_name,
+                "vector_store": self.vector_store
             },
+            "response_cache_similarity": self.response_cache_similarity,
             "total_vulnerabilities": total,
             "successful_generations": 0,
             "failed_generations": 0,
+            "cached_generations": 0,
             "total_duration_seconds": 0,
             "policy_ids_processed": []
         }
@@ -550,53 +1005,145 @@ Requirements:
         print(f"Output: {output_dir}")
         print("-" * 60)
         
-        for i, (vuln_id, policy) in enumerate(
-            self.reference_policies.items(), 1
-        ):
-            print(f"[{i}/{total}] {vuln_id}...", end=" ", flush=True)
-            
-            # Generate prompt
-            prompt = prompt_method(vuln_id, policy)
-            
-            # Call model with timing
-            response, duration, success = self.call_ollama(model, prompt, timeout)
-            
-            # Track statistics
-            metadata["total_duration_seconds"] += duration
-            metadata["policy_ids_processed"].append({
-                "vuln_id": vuln_id,
-                "duration_seconds": round(duration, 2),
-                "success": success
-            })
-            
-            if success and response:
-                generated_policies[vuln_id] = response
-                metadata["successful_generations"] += 1
-                print("✓")
-            else:
-                metadata["failed_generations"] += 1
-                print("✗")
-            
-            time.sleep(self.REQUEST_DELAY)
+        # Resume from the per-policy checkpoint of an interrupted run
+        policies_log = os.path.join(output_dir, "policies.jsonl")
+        metadata_log = os.path.join(output_dir, "metadata.jsonl")
+        generated_policies, processed = self._load_checkpoint(
+            policies_log, metadata_log
+        )
+        # Requests overlap, so the run duration is wall time and per-request
+        # latencies are summed separately for the average; checkpoint records
+        # carry the elapsed time so far, for a resumed run to continue from
+        total_latency = 0.0
+        resumed_elapsed = 0.0
+        if generated_policies:
+            print(f"Resuming: {len(generated_policies)} policies already generated")
+            metadata["cached_generations"] = sum(
+                "cached_from" in record for record in processed.values()
+            )
+            metadata["successful_generations"] = (
+                len(generated_policies) - metadata["cached_generations"]
+            )
+            total_latency = sum(
+                record["duration_seconds"] for record in processed.values()
+                if "cached_from" not in record
+            )
+            for record in processed.values():
+                resumed_elapsed = max(resumed_elapsed, record.pop("elapsed_seconds", 0.0))
+        
+        # Retrieve all RAG context up front (cache hits after the first run)
+        self._prefetch_contexts()
+        
+        done = len(generated_policies)
+        
+        # Up to num_parallel requests are in flight (Ollama serves them
+        # concurrently with OLLAMA_NUM_PARALLEL); the main thread builds the
+        # next prompt meanwhile and is the only writer of results
+        prompts = self._iter_prompts(prompt_method, skip=generated_policies)
+        
+        # Semantic response cache (opt-in), scoped to this model and experiment
+        cached_ids = list(generated_policies) if self.response_cache_similarity else []
+        cache_hits = {}
+        
+        with ThreadPoolExecutor(max_workers=self.num_parallel) as pool, \
+                open(policies_log, 'ab') as policies_out, \
+                open(metadata_log, 'ab') as metadata_out:
+            pending = {}
+            prepared = next(prompts, None)
+            while prepared or pending:
+                # Fill free slots, then prepare the prompt for the next one
+                if self.stop_requested.is_set():
+                    prepared = None
+                while prepared and len(pending) < self.num_parallel:
+                    vuln_id, prompt = prepared
+                    source_id = self._find_cached_response(vuln_id, cached_ids)
+                    if source_id:
+                        future = Future()
+                        future.set_result((generated_policies[source_id], 0.0, True))
+                        cache_hits[vuln_id] = source_id
+                    else:
+                        future = pool.submit(self.call_ollama, model, prompt, timeout)
+                    pending[future] = vuln_id
+                    prepared = next(prompts, None)
+                
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    vuln_id = pending.pop(future)
+                    response, duration, success = future.result()
+                    done += 1
+                    
+                    # Track statistics
+                    record = {
+                        "vuln_id": vuln_id,
+                        "duration_seconds": round(duration, 2),
+                        "success": success
+                    }
+                    # Cache hits are reported only as cached_generations: they
+                    # count towards neither the successes nor the latency
+                    if vuln_id in cache_hits:
+                        record["cached_from"] = cache_hits[vuln_id]
+                        metadata["cached_generations"] += 1
+                    else:
+                        total_latency += duration
+                        if success and response and self.response_cache_similarity:
+                            cached_ids.append(vuln_id)
+                    processed[vuln_id] = record
+                    
+                    status = "✗"
+                    if success and response:
+                        generated_policies[vuln_id] = response
+                        if vuln_id not in cache_hits:
+                            metadata["successful_generations"] += 1
+                        self._append_jsonl(policies_out, {vuln_id: response})
+                        status = "✓"
+                    else:
+                        metadata["failed_generations"] += 1
+                    elapsed = resumed_elapsed + time.monotonic() - run_start
+                    self._append_jsonl(metadata_out, {**record, "elapsed_seconds": round(elapsed, 2)})
+                    print(f"[{done}/{total}] {vuln_id}... ({duration:.1f}s) {status}")
+        
+        # Interrupted: the checkpoint holds every finished request, and the
+        # next run resumes from it
+        if self.stop_requested.is_set():
+            raise KeyboardInterrupt
+        
+        # Results arrive in completion order; restore the deterministic one
+        generated_policies = {
+            vuln_id: generated_policies[vuln_id] 
+            for vuln_id in self.reference_policies 
+            if vuln_id in generated_policies
+        }
         
         # Finalize metadata
-        metadata["end_time"] = datetime.now().isoformat()
+        metadata["policy_ids_processed"] = [
+            processed[vuln_id] 
+            for vuln_id in self.reference_policies 
+            if vuln_id in processed
+        ]
+        elapsed = time.monotonic() - run_start
+        metadata["end_time"] = (run_start_wall + timedelta(seconds=elapsed)).isoformat()
+        metadata["total_duration_seconds"] = resumed_elapsed + elapsed
+        # Rates over the requests actually sent to the model
+        requested = total - metadata["cached_generations"]
         metadata["completion_rate_percent"] = round(
-            metadata["successful_generations"] / total * 100, 2
+            metadata["successful_generations"] / requested * 100 if requested else 0, 2
         )
         metadata["avg_latency_seconds"] = round(
-            metadata["total_duration_seconds"] / total, 2
+            total_latency / requested if requested else 0, 2
         )
         
         # Save policies
         policies_file = os.path.join(output_dir, "policies.json")
-        with open(policies_file, 'w', encoding='utf-8') as f:
-            json.dump(generated_policies, f, indent=2, ensure_ascii=False)
+        self._write_policies_json(policies_file, generated_policies)
         
         # Save metadata
         metadata_file = os.path.join(output_dir, "metadata.json")
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        with open(metadata_file, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        
+        # Final files are complete: drop the checkpoint so the next run starts fresh
+        os.remove(policies_log)
+        os.remove(metadata_log)
         
         # Store for fairness report
         stats_key = f"{model}_exp{experiment}"
@@ -650,12 +1197,13 @@ Requirements:
                 "chunk_size": self.MAX_CONTEXT_LENGTH,
                 "random_seed": 42,
                 "policies_sorted": True,
-                "corrected_prompts": True  # NEW FLAG
+                "corrected_prompts": True,  # NEW FLAG
+                "static_prefix_prompts": True  # Static text first, policy data last
             },
             "comparison": []
         }
         
-        for key, stats in self.experiment_stats.items():
+        for key, stats in list(self.experiment_stats.items()):
             report["comparison"].append({
                 "model": stats["model"],
                 "experiment": stats["experiment"],
@@ -664,6 +1212,7 @@ Requirements:
                 "timeout_seconds": stats["timeout_seconds"],
                 "successful_generations": stats["successful_generations"],
                 "failed_generations": stats["failed_generations"],
+                "cached_generations": stats["cached_generations"],
                 "total_duration_seconds": round(stats["total_duration_seconds"], 2)
             })
         
@@ -673,8 +1222,8 @@ Requirements:
         # Save report
         report_file = os.path.join(self.output_dir, "logs", "fairness_report_CORRECTED.json")
         os.makedirs(os.path.dirname(report_file), exist_ok=True)
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
         
         print(f"\n{'='*60}")
         print(f"✓ Fairness Report: {report_file}")
@@ -750,6 +1299,16 @@ def main():
     MODELS = ["llama3.1", "deepseek-r1:8b", "gpt-oss:20b"]
     EXPERIMENT = "2"              # "1", "2", or "both"
     LIMIT = 122                      # Number of policies per model
+    # Models generated side by side; only useful when the Ollama server keeps
+    # several models loaded (OLLAMA_MAX_LOADED_MODELS > 1)
+    MODEL_CONCURRENCY = int(os.getenv("OLLAMA_MAX_LOADED_MODELS", "1"))
+    # Concurrent requests per model; match the server's OLLAMA_NUM_PARALLEL
+    NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))
+    # Reuse a model's response for near-duplicate vulnerabilities (e.g. 0.86);
+    # None keeps every policy an independent generation
+    RESPONSE_CACHE_SIMILARITY = None
+    # int8 ONNX embedder on CPU-only machines (pip install -r requirements-onnx.txt)
+    ONNX_INT8_EMBEDDER = os.getenv("ONNX_INT8_EMBEDDER", "0") == "1"
     
     # ==========================================================================
     # PATHS
@@ -764,6 +1323,10 @@ def main():
         os.path.dirname(__file__), 
         "policies"
     )
+    # Built by build_local_index.py; when present, Pinecone is not used
+    LOCAL_INDEX_DIR = os.path.join(OUTPUT_DIR, "rag_index")
+    if not os.path.isdir(LOCAL_INDEX_DIR):
+        LOCAL_INDEX_DIR = None
     
     # ==========================================================================
     # API CONFIGURATION
@@ -773,7 +1336,7 @@ def main():
     load_dotenv()
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     
-    if not PINECONE_API_KEY:
+    if not PINECONE_API_KEY and not LOCAL_INDEX_DIR:
         print("✗ Error: PINECONE_API_KEY not found in environment")
         print("  Add it to your .env file: PINECONE_API_KEY=your_key_here")
         return
@@ -789,6 +1352,8 @@ def main():
     print(f"Models: {', '.join(MODELS)}")
     print(f"Experiment: {EXPERIMENT}")
     print(f"Limit: {LIMIT} policies per model")
+    print(f"Model concurrency: {MODEL_CONCURRENCY}")
+    print(f"Requests per model: {NUM_PARALLEL}")
     print(f"Exp1 Timeout: 300s (SAME for all models)")
     print("✅ Llama 3.1: FIXED with proper special tokens")
     print("✅ DeepSeek R1: FIXED with reasoning format")
@@ -800,12 +1365,34 @@ def main():
         reference_policies_file=REFERENCE_POLICIES_PATH,
         output_dir=OUTPUT_DIR,
         pinecone_api_key=PINECONE_API_KEY,
-        limit_per_model=LIMIT
+        limit_per_model=LIMIT,
+        local_index_dir=LOCAL_INDEX_DIR,
+        num_parallel=NUM_PARALLEL,
+        response_cache_similarity=RESPONSE_CACHE_SIMILARITY,
+        onnx_int8_embedder=ONNX_INT8_EMBEDDER
     )
     
     try:
-        for model in MODELS:
-            generator.run(model, EXPERIMENT)
+        if MODEL_CONCURRENCY > 1:
+            pool = ThreadPoolExecutor(max_workers=MODEL_CONCURRENCY)
+            try:
+                futures = [
+                    pool.submit(generator.run, model, EXPERIMENT) 
+                    for model in MODELS
+                ]
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                generator.stop_requested.set()
+                raise
+            finally:
+                # After Ctrl-C, drop queued models and let running ones stop at
+                # their next vulnerability instead of waiting for them
+                interrupted = generator.stop_requested.is_set()
+                pool.shutdown(wait=not interrupted, cancel_futures=interrupted)
+        else:
+            for model in MODELS:
+                generator.run(model, EXPERIMENT)
     except KeyboardInterrupt:
         print("\n\n✗ Execution interrupted by user")
     finally:
@@ -1,53 +1,78 @@
-import json
 import os
-from pathlib import Path
+import re
+import sys
+import ijson
+import orjson
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any
 
+# Report directory name -> report format, in detection priority order
+REPORT_FORMATS = {
+    'container-scan': 'trivy',
+    'sast-reports': 'semgrep',
+    'iac-scan': 'checkov',
+    'cve-reports': 'grype',
+    'dast-reports': 'owasp-zap',
+}
+REPORT_FORMAT_RANK = {marker: rank for rank, marker in enumerate(REPORT_FORMATS)}
+# Lookahead: overlapping markers are all found in one scan of the path
+REPORT_DIR_PATTERN = re.compile('(?=(%s))' % '|'.join(map(re.escape, REPORT_FORMATS)))
+# Repeated across most findings: kept as a single shared string each
+INTERNED_FIELDS = ('type', 'severity', 'source', 'cwe')
+
 class SecurityReportParser:
     def __init__(self, brut_dir: str, parsed_dir: str):
         self.brut_dir = brut_dir
         self.parsed_dir = parsed_dir
         self.deduplicated_vulns = {}  # Key: (vuln_id, affected_component)
+        self._parsers = {
+            'trivy': self.parse_trivy,
+            'grype': self.parse_grype,
+            'checkov': self.parse_checkov,
+            'semgrep': self.parse_semgrep,
+            'owasp-zap': self.parse_owasp_zap,
+        }
     
     def crawl_reports(self) -> List[tuple]:
         """Recursively find all .json report files"""
-        files = []
-        for root, dirs, filenames in os.walk(self.brut_dir):
-            for filename in filenames:
-                if filename.endswith('.json'):
-                    file_path = os.path.join(root, filename)
-                    report_type = self.detect_report_format(file_path)
-                    pipeline_run = Path(root).name
-                    if pipeline_run.isdigit():
-                        files.append((file_path, report_type, int(pipeline_run)))  
-        return files
+        return list(self._scan_reports(self.brut_dir))
+
+    def _scan_reports(self, directory: str):
+        """Yield (file_path, report_type, run_id) for reports in numbered run dirs"""
+        pipeline_run = os.path.basename(directory)
+        reports = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                # DirEntry caches the file type from the directory listing
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith('.json') and pipeline_run.isdigit():
+                        reports.append(entry.path)
+        except OSError:
+            return  # Unreadable or vanished directory: skipped, as os.walk did
+        for file_path in reports:
+            yield file_path, self.detect_report_format(file_path), int(pipeline_run)
+        # Files before subdirectories: same order as the former os.walk
+        for subdir in subdirs:
+            yield from self._scan_reports(subdir)
 
     def detect_report_format(self, file_path: str) -> str:
-        """Detect format from JSON structure"""
-        if file_path.__contains__('container-scan'):
-            return 'trivy'
-        elif file_path.__contains__('sast-reports'):
-            return 'semgrep'
-        elif file_path.__contains__('iac-scan'):
-            return 'checkov'
-        elif file_path.__contains__('cve-reports'):
-            return 'grype'
-        elif file_path.__contains__('dast-reports'):
-            return 'owasp-zap'
+        """Detect format from the report directory in the path
+
+        One scan finds every marker; a path containing several resolves to
+        the first in REPORT_FORMATS order.
+        """
+        markers = REPORT_DIR_PATTERN.findall(file_path)
+        if not markers:
+            return None
+        return REPORT_FORMATS[min(markers, key=REPORT_FORMAT_RANK.__getitem__)]
 
     def parse_report(self, file_path: str, report_type: str, run_id: int) -> List[Dict]:
         """Parse specific report format"""
-        if report_type == 'trivy':
-            return self.parse_trivy(file_path, run_id)
-        elif report_type == 'grype':
-            return self.parse_grype(file_path, run_id)
-        elif report_type == 'checkov':
-            return self.parse_checkov(file_path, run_id)
-        elif report_type == 'semgrep':
-            return self.parse_semgrep(file_path, run_id)
-        elif report_type == 'owasp-zap':
-            return self.parse_owasp_zap(file_path, run_id)
-        return []
+        parse = self._parsers.get(report_type)
+        return parse(file_path, run_id) if parse else []
 
     def deduplicate_and_merge(self, vulns: List[Dict], run_id: int):
         """Merge vulnerabilities, deduplicating by vuln_id only and collecting affected components"""
@@ -55,47 +80,47 @@ class SecurityReportParser:
             key = vuln['vuln_id']
             if key in self.deduplicated_vulns:
                 existing = self.deduplicated_vulns[key]
-                # Merge affected components
-                if vuln['affected_component'] not in existing['affected_components']:
-                    existing['affected_components'].append(vuln['affected_component'])
+                # Merge affected components (dicts as insertion-ordered sets)
+                existing['affected_components'][vuln['affected_component']] = None
                 # Update metadata if more complete
                 for field in ['cvss_score', 'fixed_version', 'description', 'cwe']:
                     if not existing.get(field) and vuln.get(field):
                         existing[field] = vuln[field]
                 # Update pipeline runs and occurrences
-                if run_id not in existing['pipeline_runs']:
-                    existing['pipeline_runs'].append(run_id)
+                existing['pipeline_runs'][run_id] = None
                 existing['occurrences'] += vuln.get('occurrences', 1)
             else:
-                # Initialize new entry
-                vuln['affected_components'] = [vuln.pop('affected_component')]
-                vuln['pipeline_runs'] = [run_id]
+                # Initialize new entry; low-cardinality values share one string
+                for field in INTERNED_FIELDS:
+                    if isinstance(vuln.get(field), str):
+                        vuln[field] = sys.intern(vuln[field])
+                vuln['affected_components'] = {vuln.pop('affected_component'): None}
+                vuln['pipeline_runs'] = {run_id: None}
                 vuln['occurrences'] = vuln.get('occurrences', 1)
                 self.deduplicated_vulns[key] = vuln
 
     def parse_trivy(self, file_path: str, run_id: int) -> List[Dict]:
         """Parse Trivy container scan report"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
         vulns = []
-        for result in data.get('Results', []):
-            for vuln in result.get('Vulnerabilities', []):
-                cvss_score = vuln.get('CVSS', {}).get('nvd', {}).get('V3Score')
-            
-                new_vuln = {
-                    "vuln_id": vuln.get('VulnerabilityID'),
-                    "type": "vulnerability",
-                    "title": vuln.get('Title'),
-                    "affected_component": vuln.get('PkgName'),
-                    "affected_version": vuln.get('InstalledVersion'),
-                    "severity": vuln.get('Severity', 'UNKNOWN'),
-                    "description": vuln.get('Description'),
-                    "cvss_score": cvss_score,
-                    "fixed_version": vuln.get('FixedVersion'),
-                    "source": "trivy",
-                }
-                vulns.append(new_vuln)
+        # Stream one result at a time: container scans can be very large
+        with open(file_path, 'rb') as f:
+            for result in ijson.items(f, 'Results.item', use_float=True):
+                for vuln in result.get('Vulnerabilities', []):
+                    cvss_score = vuln.get('CVSS', {}).get('nvd', {}).get('V3Score')
+                
+                    new_vuln = {
+                        "vuln_id": vuln.get('VulnerabilityID'),
+                        "type": "vulnerability",
+                        "title": vuln.get('Title'),
+                        "affected_component": vuln.get('PkgName'),
+                        "affected_version": vuln.get('InstalledVersion'),
+                        "severity": vuln.get('Severity', 'UNKNOWN'),
+                        "description": vuln.get('Description'),
+                        "cvss_score": cvss_score,
+                        "fixed_version": vuln.get('FixedVersion'),
+                        "source": "trivy",
+                    }
+                    vulns.append(new_vuln)
         none_count = sum(1 for v in vulns if v.get('vuln_id') is None)
         if none_count > 0:
             print(f"Warning: {none_count} vulnerabilities found without IDs.")
@@ -103,38 +128,36 @@ class SecurityReportParser:
 
     def parse_grype(self, file_path: str, run_id: int) -> List[Dict]:
         """Parse Grype SCA report"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-
         vulns = []
-        for match in data.get('matches', []):
-            vuln_data = match.get('vulnerability', {})
-            artifact = match.get('artifact', {})
+        # Stream matches one at a time instead of loading the whole report
+        with open(file_path, 'rb') as f:
+            for match in ijson.items(f, 'matches.item', use_float=True):
+                vuln_data = match.get('vulnerability', {})
+                artifact = match.get('artifact', {})
             
-            cvss_data = vuln_data.get('cvss', [])
-            cvss_score = cvss_data[0].get('metrics', {}).get('baseScore') if cvss_data else None
+                cvss_data = vuln_data.get('cvss', [])
+                cvss_score = cvss_data[0].get('metrics', {}).get('baseScore') if cvss_data else None
             
-            cwe_list = vuln_data.get('cwes', [])
-            cwe = cwe_list[0].get('cwe') if cwe_list else None
+                cwe_list = vuln_data.get('cwes', [])
+                cwe = cwe_list[0].get('cwe') if cwe_list else None
             
-            fix_versions = vuln_data.get('fix', {}).get('versions', [])
-            fixed_version = fix_versions[0] if fix_versions else None
+                fix_versions = vuln_data.get('fix', {}).get('versions', [])
+                fixed_version = fix_versions[0] if fix_versions else None
             
-            new_vuln = {
-                "vuln_id": vuln_data.get('id'),
-                "type": "dependency",
-                "title": vuln_data.get('description', '').split('\n')[0],
-                "affected_component": artifact.get('name'),
-                "affected_version": artifact.get('version'),
-                "severity": vuln_data.get('severity', 'UNKNOWN'),
-                "description": vuln_data.get('description'),
-                "cvss_score": cvss_score,
-                "cwe": cwe,
-                "fixed_version": fixed_version,
-                "source": "grype",
-            }
-            vulns.append(new_vuln)
+                new_vuln = {
+                    "vuln_id": vuln_data.get('id'),
+                    "type": "dependency",
+                    "title": vuln_data.get('description', '').split('\n')[0],
+                    "affected_component": artifact.get('name'),
+                    "affected_version": artifact.get('version'),
+                    "severity": vuln_data.get('severity', 'UNKNOWN'),
+                    "description": vuln_data.get('description'),
+                    "cvss_score": cvss_score,
+                    "cwe": cwe,
+                    "fixed_version": fixed_version,
+                    "source": "grype",
+                }
+                vulns.append(new_vuln)
         none_count = sum(1 for v in vulns if v.get('vuln_id') is None)
         if none_count > 0:
             print(f"Warning: {none_count} vulnerabilities found without IDs.")
@@ -142,8 +165,8 @@ class SecurityReportParser:
 
     def parse_checkov(self, file_path: str, run_id: int) -> List[Dict]:
         """Parse Checkov IaC scan report"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
 
         vulns = []
         
@@ -172,8 +195,8 @@ class SecurityReportParser:
 
     def parse_semgrep(self, file_path: str, run_id: int) -> List[Dict]:
         """Parse Semgrep SAST report"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
 
         vulns = []
         
@@ -202,31 +225,29 @@ class SecurityReportParser:
         return vulns
     def parse_owasp_zap(self, file_path: str, run_id: int) -> List[Dict]:
         """Parse OWASP ZAP DAST report"""
+        vulns = []
+        # Stream sites one at a time; malformed files are reported and skipped
         try:
-             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                for site in ijson.items(f, 'site.item', use_float=True):
+                    for alert in site.get('alerts', []):
+                        new_vuln = {
+                            "vuln_id": alert.get('pluginid'),
+                            "type": "dast_finding",
+                            "title": alert.get('name'),
+                            "affected_component": site.get('name'),
+                            "affected_url": alert.get('url'),
+                            "severity": alert.get('riskcode').upper() if alert.get('riskcode') else 'MEDIUM',
+                            "description": alert.get('desc'),
+                            "cvss_score": None,
+                            "cwe": alert.get('cwe'),
+                            "fixed_version": None,
+                            "source": "owasp-zap",
+                        }
+                        vulns.append(new_vuln)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return []
-
-        vulns = []
-    
-        for site in data.get('site', []):
-            for alert in site.get('alerts', []):
-                new_vuln = {
-                    "vuln_id": alert.get('pluginid'),
-                    "type": "dast_finding",
-                    "title": alert.get('name'),
-                    "affected_component": site.get('name'),
-                    "affected_url": alert.get('url'),
-                    "severity": alert.get('riskcode').upper() if alert.get('riskcode') else 'MEDIUM',
-                    "description": alert.get('desc'),
-                    "cvss_score": None,
-                    "cwe": alert.get('cwe'),
-                    "fixed_version": None,
-                    "source": "owasp-zap",
-                }
-                vulns.append(new_vuln)
     
         none_count = sum(1 for v in vulns if v.get('vuln_id') is None)
         if none_count > 0:
@@ -236,18 +257,41 @@ class SecurityReportParser:
     def run(self):
         """Main orchestration"""
         files = self.crawl_reports()
-        for file_path, report_type, pipeline_run in files:
-            vulns = self.parse_report(file_path, report_type, pipeline_run)
-            vulns = [v for v in vulns if v.get('vuln_id') is not None]
-            self.deduplicate_and_merge(vulns, pipeline_run)
+        # Files parse independently in worker processes; merging stays on this
+        # process, in crawl order, so the output is the same as a serial run
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(_parse_file, files)
+            for (_, _, pipeline_run), vulns in zip(files, results):
+                self.deduplicate_and_merge(vulns, pipeline_run)
         self.save_parsed_reports()
     
     def save_parsed_reports(self):
         """Save deduplicated vulnerabilities to JSON"""
         output_path = os.path.join(self.parsed_dir, 'deduplicated_vulnerabilities.json')
         os.makedirs(self.parsed_dir, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(list(self.deduplicated_vulns.values()), f, indent=2)
+        # Stream one record at a time (same bytes as dumping the whole list
+        # with OPT_INDENT_2); ordered-set fields become lists in first-seen order
+        with open(output_path, 'wb') as f:
+            f.write(b'[')
+            for i, vuln in enumerate(self.deduplicated_vulns.values()):
+                record = {
+                    **vuln,
+                    'affected_components': list(vuln['affected_components']),
+                    'pipeline_runs': list(vuln['pipeline_runs']),
+                }
+                f.write(b',\n  ' if i else b'\n  ')
+                f.write(orjson.dumps(record, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  '))
+            f.write(b'\n]' if self.deduplicated_vulns else b']')
+
+def _parse_file(file_info: tuple) -> List[Dict]:
+    """Parse one crawled report in a worker, dropping findings without an ID
+
+    Module-level with a fresh parser: only the file tuple is sent to the
+    worker, not the parser and its growing merge state.
+    """
+    file_path, report_type, pipeline_run = file_info
+    vulns = SecurityReportParser(None, None).parse_report(file_path, report_type, pipeline_run)
+    return [v for v in vulns if v.get('vuln_id') is not None]
 
 if __name__ == "__main__":
     parser = SecurityReportParser(
@@ -256,8 +300,3 @@ if __name__ == "__main__":
     )
     parser.run()
     print(len(parser.deduplicated_vulns), "deduplicated vulnerabilities found.")
-
-
-
-# how many policies
-print(len(parser.policy_vulns), "policy violations found.")
\ No newline at end of file
@@ -8,28 +8,63 @@ This script runs Experiment 3 using:
 
 Usage:
     python run_experiment3.py --limit 20 --models "llama3.1" "deepseek-r1:8b"
+
+Concurrency:
+    Start Ollama with OLLAMA_NUM_PARALLEL=4 (and OLLAMA_MAX_LOADED_MODELS=1,
+    models run one after another) and pass --concurrency 4.
 """
 
-import json
+import orjson
 import os
 import sys
 import argparse
+import functools
+import hashlib
+import heapq
 import time
-import torch
-import numpy as np
+import ijson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
 import requests
 
-# Set reproducibility seeds
-torch.manual_seed(42)
-np.random.seed(42)
+# gRPC transport (pip install "pinecone[grpc]"): HTTP/2 multiplexing and
+# protobuf payloads for the concurrent queries; REST SDK otherwise
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+except ImportError:
+    from pinecone import Pinecone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+# Process-wide singletons: generators for several models (or experiments) in
+# one process share the embedder, the Pinecone client and the host lookup
+_PINECONE_HOSTS: Dict[str, str] = {}  # API key -> index host (successful lookups only)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_embedder(device: str, onnx_file: Optional[str] = None):
+    """all-MiniLM-L6-v2 on `device`, from the given ONNX export if any"""
+    from sentence_transformers import SentenceTransformer
+    if onnx_file:
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            device=device,
+            backend="onnx",
+            model_kwargs={"file_name": onnx_file}
+        )
+    return SentenceTransformer('all-MiniLM-L6-v2', device=device)
+
+
+@functools.lru_cache(maxsize=None)
+def _pinecone_index(api_key: str, host: str):
+    """Pinecone index handle (keeps its own connection pool)"""
+    return Pinecone(api_key=api_key).Index(host=host)
+
 
 class Experiment3RAGGenerator:
     """Experiment 3: Standard Prompt + RAG with Morocco AI documents"""
@@ -39,14 +74,19 @@ class Experiment3RAGGenerator:
     TIMEOUT = 300  # 5 minutes (same as Exp1)
     MAX_CONTEXT_LENGTH = 200
     RAG_TOP_K = 2
+    BUSY_BACKOFF = 0.5  # Pause after Ollama answers 429/503
+    STREAM_RETRIES = 2  # Re-requests after a response stream is cut short
+    OLLAMA_KEEP_ALIVE = "30m"  # Keep the model resident between calls
+    RAG_QUERY_WORKERS = 16  # Concurrent Pinecone queries during prefetch
+    ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"  # Runs on any AVX2 CPU
     RAG_NAMESPACE = "compliance-rag"  # Where Morocco AI documents are stored
     
-    # Standard Prompt (same as Experiment 1) with Morocco AI Governance Context
-    STANDARD_PROMPT = """You are a security policy expert with expertise in AI governance frameworks. Generate a concise, actionable security compliance policy for addressing the following vulnerability or security control:
+    # Standard Prompt (same as Experiment 1) with Morocco AI Governance Context.
+    # Split around the per-vulnerability fields so only those are formatted.
+    PROMPT_HEAD = """You are a security policy expert with expertise in AI governance frameworks. Generate a concise, actionable security compliance policy for addressing the following vulnerability or security control:
 
-Vulnerability/Control: {vuln_title}
-Severity: {severity}
-Description: {description}
+Vulnerability/Control: """
+    PROMPT_TAIL = """
 
 Generate a clear, structured policy that includes:
 1. Policy Objective
@@ -82,6 +122,8 @@ Attribution: Framework based on work by Asmae Lamgari on Morocco's AI governance
 ===== END MOROCCO AI CONTEXT =====
 
 Policy:"""
+    RAG_CONTEXT_HEAD = "\n\n[Additional Context from AI Governance & Sovereignty Framework]:\n"
+    RAG_CONTEXT_TAIL = "\n\nPlease consider the above framework context when generating the policy."
 
     def __init__(
         self,
@@ -89,25 +131,61 @@ Policy:"""
         reference_policies_file: str,
         output_dir: str,
         pinecone_api_key: str,
-        limit_per_model: int = 20
+        limit_per_model: int = 20,
+        concurrency: int = 1,
+        onnx_int8_embedder: bool = False
     ):
         """Initialize Experiment 3 generator"""
         self.ollama_endpoint = ollama_endpoint
+        self.concurrency = max(1, concurrency)
         self.output_dir = output_dir
         self.limit_per_model = limit_per_model
         self.pinecone_api_key = pinecone_api_key
         
-        # Load vulnerabilities
-        with open(reference_policies_file, 'r', encoding='utf-8') as f:
-            policies_raw = json.load(f)
+        # Heavy imports are deferred to here so importing this module stays cheap
+        import torch
+        import numpy as np
+        
+        # Set reproducibility seeds
+        torch.manual_seed(42)
+        np.random.seed(42)
         
-        # Sort for deterministic order
-        sorted_items = sorted(policies_raw.items())[:limit_per_model]
+        # Load vulnerabilities: stream the reference file, keeping only the
+        # first `limit_per_model` by ID (deterministic order)
+        with open(reference_policies_file, 'rb') as f:
+            sorted_items = heapq.nsmallest(
+                limit_per_model,
+                ijson.kvitems(f, '', use_float=True),
+                key=lambda item: item[0]
+            )
         self.vulnerabilities = dict(sorted_items)
         
+        # Keep-alive connection pools: TLS to Pinecone and TCP to Ollama are
+        # set up once instead of per request
+        self._pinecone_session = self._create_session()
+        self._ollama_session = self._create_session()
+        
         # Initialize RAG
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.embedder_name = "all-MiniLM-L6-v2"
+        if device == 'cpu' and onnx_int8_embedder:
+            # Dynamically quantized int8 export shipped with the model on the Hub
+            self.embedder = _load_embedder(device, self.ONNX_INT8_FILE)
+            self.embedder_name += " (onnx-int8)"
+        else:
+            self.embedder = _load_embedder(device)
         self.pinecone_host = self._get_pinecone_host()
+        if self.pinecone_host:
+            self._index = _pinecone_index(pinecone_api_key, self.pinecone_host)
+        
+        # Queries only depend on the vulnerability: embed them all in one batch,
+        # reusing vectors cached on disk by earlier runs
+        # (int8 vectors differ slightly, so they get their own cache)
+        self._cache_dir = Path(output_dir) / ".emb_cache"
+        if self.embedder_name.endswith("(onnx-int8)"):
+            self._cache_dir = self._cache_dir / "onnx-int8"
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._query_embeddings = self._precompute_query_embeddings()
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
@@ -115,6 +193,7 @@ Policy:"""
         print("Experiment 3 Initialized")
         print(f"  Vulnerabilities: {len(self.vulnerabilities)}")
         print(f"  Timeout: {self.TIMEOUT}s")
+        print(f"  Concurrency: {self.concurrency}")
         print(f"  RAG: Enabled (namespace: {self.RAG_NAMESPACE})")
         print("  Prompt: Standard")
         print()
@@ -124,22 +203,80 @@ Policy:"""
         print("  Document 2: Operationalizing AI Sovereignty (101 chunks)")
         print("  Total Vectors: 146")
     
+    def _create_session(self) -> requests.Session:
+        """HTTP session with a pool sized for concurrent requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
     def _get_pinecone_host(self) -> str:
-        """Get Pinecone host from API"""
+        """Get Pinecone host from API (looked up once per process)"""
+        if self.pinecone_api_key in _PINECONE_HOSTS:
+            return _PINECONE_HOSTS[self.pinecone_api_key]
         headers = {"Api-Key": self.pinecone_api_key}
         try:
-            response = requests.get(
+            response = self._pinecone_session.get(
                 "https://api.pinecone.io/indexes/compliance-rag",
                 headers=headers,
                 timeout=10
             )
             if response.status_code == 200:
-                return response.json().get('host', '')
+                host = orjson.loads(response.content).get('host', '')
+                if host:
+                    _PINECONE_HOSTS[self.pinecone_api_key] = host
+                return host
         except Exception as e:
             print(f"Warning: Could not get Pinecone host: {e}")
         return ""
     
-    def retrieve_rag_context(self, query_text: str, top_k: int = None) -> str:
+    def _build_query(self, vuln_data: Dict) -> str:
+        """RAG query text for a vulnerability"""
+        return f"{vuln_data.get('title', '')} {vuln_data.get('description', '')}"
+    
+    def _embedding_cache_path(self, text: str) -> Path:
+        """Disk cache location for a query's embedding (content-addressed)"""
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        return self._cache_dir / f"{key}.npy"
+    
+    def _precompute_query_embeddings(self) -> Dict[str, List[float]]:
+        """Embed every vulnerability's RAG query, batch-encoding only cache misses"""
+        import numpy as np
+        
+        queries = {
+            vuln_id: self._build_query(v) for vuln_id, v in self.vulnerabilities.items()
+        }
+        
+        embeddings = {}
+        missing = []
+        for vuln_id, query in queries.items():
+            cache_path = self._embedding_cache_path(query)
+            if cache_path.exists():
+                embeddings[vuln_id] = np.load(cache_path)
+            else:
+                missing.append(vuln_id)
+        
+        if missing:
+            encoded = self.embedder.encode(
+                [queries[vuln_id] for vuln_id in missing],
+                batch_size=32,
+                convert_to_numpy=True,
+                normalize_embeddings=True,  # Cosine index: ranking unchanged
+                show_progress_bar=False
+            )
+            for vuln_id, embedding in zip(missing, encoded):
+                np.save(self._embedding_cache_path(queries[vuln_id]), embedding)
+                embeddings[vuln_id] = embedding
+        
+        print(f"Query embeddings: {len(queries) - len(missing)} cached, {len(missing)} encoded")
+        return {vuln_id: embeddings[vuln_id].tolist() for vuln_id in queries}
+    
+    def retrieve_rag_context(self, query_embedding: List[float], top_k: int = None) -> str:
         """Retrieve context from Pinecone using RAG"""
         if not self.pinecone_host:
             return ""
@@ -148,44 +285,48 @@ Policy:"""
             top_k = self.RAG_TOP_K
         
         try:
-            # Embed query
-            query_embedding = self.embedder.encode(query_text).tolist()
-            
-            # Query Pinecone
-            headers = {"Api-Key": self.pinecone_api_key}
-            payload = {
-                "topK": top_k,
-                "includeMetadata": True,
-                "vector": query_embedding,
-                "namespace": self.RAG_NAMESPACE
-            }
-            
-            response = requests.post(
-                f"https://{self.pinecone_host}/query",
-                json=payload,
-                headers=headers,
-                timeout=10
+            # Query Pinecone (only the metadata text is used, never the vectors)
+            results = self._index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                namespace=self.RAG_NAMESPACE,
+                include_metadata=True,
+                include_values=False
             )
+            context_parts = []
             
-            if response.status_code == 200:
-                results = response.json()
-                context_parts = []
-                
-                for match in results.get('matches', []):
-                    metadata = match.get('metadata', {})
-                    text = metadata.get('text', '')
-                    if text:
-                        context_parts.append(text[:self.MAX_CONTEXT_LENGTH])
-                
-                return "\n---\n".join(context_parts)
+            for match in results['matches']:
+                metadata = match['metadata'] or {}
+                text = metadata.get('text', '')
+                if text:
+                    context_parts.append(text[:self.MAX_CONTEXT_LENGTH])
+            
+            return "\n---\n".join(context_parts)
         
         except Exception as e:
             print(f"Warning: RAG retrieval failed: {e}")
         
         return ""
     
+    def _prefetch_rag_contexts(self):
+        """Start retrieving every vulnerability's RAG context in the background
+        
+        Lookups are queued in processing order and run up to RAG_QUERY_WORKERS
+        at a time, well ahead of generation, so Pinecone latency overlaps with
+        Ollama calls. The context is the same for every model, so it is
+        fetched once per run.
+        """
+        rag_pool = ThreadPoolExecutor(max_workers=self.RAG_QUERY_WORKERS)
+        self._rag_contexts = {
+            vuln_id: rag_pool.submit(self.retrieve_rag_context, embedding, self.RAG_TOP_K)
+            for vuln_id, embedding in self._query_embeddings.items()
+        }
+        # Queued lookups still complete; the threads exit once they are done
+        rag_pool.shutdown(wait=False)
+    
     def generate_policy_with_rag(
         self,
+        vuln_id: str,
         vuln_data: Dict,
         model: str
     ) -> tuple:
@@ -194,49 +335,74 @@ Policy:"""
         start_time = time.time()
         
         try:
-            # Prepare query for RAG
-            query = f"{vuln_data.get('title', '')} {vuln_data.get('description', '')}"
-            
-            # Retrieve context from Morocco AI documents
-            rag_context = self.retrieve_rag_context(query, top_k=self.RAG_TOP_K)
+            # Context from Morocco AI documents, prefetched in the background
+            rag_context = self._rag_contexts[vuln_id].result()
             
             # Build prompt with RAG context
-            base_prompt = self.STANDARD_PROMPT.format(
-                vuln_title=vuln_data.get('title', 'Unknown'),
-                severity=vuln_data.get('severity', 'Medium'),
-                description=vuln_data.get('description', 'N/A')
+            base_prompt = (
+                f"{self.PROMPT_HEAD}{vuln_data.get('title', 'Unknown')}"
+                f"\nSeverity: {vuln_data.get('severity', 'Medium')}"
+                f"\nDescription: {vuln_data.get('description', 'N/A')}{self.PROMPT_TAIL}"
             )
             
             if rag_context:
-                rag_prompt = f"""{base_prompt}
-
-[Additional Context from AI Governance & Sovereignty Framework]:
-{rag_context}
-
-Please consider the above framework context when generating the policy."""
+                rag_prompt = f"{base_prompt}{self.RAG_CONTEXT_HEAD}{rag_context}{self.RAG_CONTEXT_TAIL}"
             else:
                 rag_prompt = base_prompt
             
-            # Call Ollama API
-            response = requests.post(
-                f"{self.ollama_endpoint}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": rag_prompt,
-                    "stream": False,
-                    "num_predict": 500
-                },
-                timeout=self.TIMEOUT
-            )
+            # Call Ollama API, streaming tokens as they are generated. A stream
+            # that ends without its "done" chunk (dropped connection, server
+            # restart) is truncated: it is requested again, then failed
+            for _ in range(self.STREAM_RETRIES + 1):
+                response = self._ollama_session.post(
+                    f"{self.ollama_endpoint}/api/generate",
+                    json={
+                        "model": model,
+                        "prompt": rag_prompt,
+                        "stream": True,
+                        # No num_predict cap: output length stays as uncapped as
+                        # Experiments 1/2; keep_alive keeps the model (and its
+                        # prompt cache) loaded
+                        "keep_alive": self.OLLAMA_KEEP_ALIVE
+                    },
+                    stream=True,
+                    timeout=self.TIMEOUT
+                )
+                
+                with response:
+                    if response.status_code != 200:
+                        elapsed = time.time() - start_time
+                        if response.status_code in (429, 503):
+                            # Server is saturated: back off before this worker's next call
+                            time.sleep(self.BUSY_BACKOFF)
+                        return f"Error: {response.status_code}", elapsed, False
+                    
+                    chunks = []
+                    completed = False
+                    try:
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+                            chunk = orjson.loads(line)
+                            if "error" in chunk:
+                                return f"Error: {chunk['error']}", time.time() - start_time, False
+                            chunks.append(chunk.get('response', ''))
+                            if chunk.get('done'):
+                                completed = True
+                                break
+                            # The read timeout only bounds gaps between chunks
+                            if time.time() - start_time > self.TIMEOUT:
+                                return "Timeout", time.time() - start_time, False
+                    except requests.exceptions.ChunkedEncodingError:
+                        pass  # Connection cut mid-stream
+                
+                if completed:
+                    elapsed = time.time() - start_time
+                    policy = "".join(chunks).strip()
+                    return policy, elapsed, True
             
             elapsed = time.time() - start_time
-            
-            if response.status_code == 200:
-                result = response.json()
-                policy = result.get('response', '').strip()
-                return policy, elapsed, True
-            else:
-                return f"Error: {response.status_code}", elapsed, False
+            return "Error: response stream ended before completion", elapsed, False
         
         except requests.exceptions.Timeout:
             elapsed = time.time() - start_time
@@ -245,12 +411,67 @@ Please consider the above framework context when generating the policy."""
             elapsed = time.time() - start_time
             return f"Error: {str(e)}", elapsed, False
     
+    def _append_jsonl(self, f, record: Dict):
+        """Append one record to a JSON Lines checkpoint and flush it to disk"""
+        f.write(orjson.dumps(record) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    
+    def _read_jsonl(self, path: str) -> List[Dict]:
+        """Records of a JSON Lines checkpoint
+        
+        A final line torn by a kill or power loss mid-append is dropped with a
+        warning and truncated away, so appends on resume start on a new line.
+        """
+        records = []
+        with open(path, 'rb+') as f:
+            lines = f.readlines()
+            offset = 0
+            for i, line in enumerate(lines):
+                if line.strip():
+                    try:
+                        records.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        if i < len(lines) - 1:
+                            raise
+                        print(f"Warning: dropping incomplete last line of {path}")
+                        f.truncate(offset)
+                        break
+                offset += len(line)
+            else:
+                if lines and not lines[-1].endswith(b"\n"):
+                    f.write(b"\n")  # Complete record cut just before its newline
+        return records
+    
+    def _load_checkpoint(self, policies_log: str, metadata_log: str) -> Dict[str, tuple]:
+        """Successful generations of an interrupted run: vuln_id -> (policy, duration, process_info)
+        
+        Failed attempts, and policies whose metadata line was never written,
+        are generated again.
+        """
+        if not (os.path.exists(policies_log) and os.path.exists(metadata_log)):
+            return {}
+        
+        policies = {}
+        for record in self._read_jsonl(policies_log):
+            policies[record["vuln_id"]] = record["policy"]
+        
+        done = {}
+        for info in self._read_jsonl(metadata_log):
+            if info["success"] and info["vuln_id"] in policies:
+                done[info["vuln_id"]] = (
+                    policies[info["vuln_id"]], info["duration_seconds"], info
+                )
+        return done
+    
     def run_experiment(self, models: List[str]) -> Dict:
         """Run Experiment 3 for specified models"""
         
         experiment_stats = {}
         all_policies = {}
         
+        self._prefetch_rag_contexts()
+        
         for model in models:
             print(f"\n{'='*60}")
             print(f"Model: {model}")
@@ -294,7 +515,7 @@ Please consider the above framework context when generating the policy."""
                         }
                     },
                     "total_vectors": 146,
-                    "embedder": "all-MiniLM-L6-v2",
+                    "embedder": self.embedder_name,
                     "vector_dimension": 384,
                     "similarity_metric": "cosine",
                     "author_attribution": "Asmae Lamgari - Morocco AI Research & Governance Framework"
@@ -306,35 +527,64 @@ Please consider the above framework context when generating the policy."""
                 "policy_ids_processed": []
             }
             
-            total_duration = 0.0
+            # Resume from the per-vulnerability checkpoint of an interrupted run
+            policies_log = os.path.join(output_dir, "policies.jsonl")
+            metadata_log = os.path.join(output_dir, "metadata.jsonl")
+            results = self._load_checkpoint(policies_log, metadata_log)
+            if results:
+                print(f"  Resuming: {len(results)} policies already generated")
+            pending = [
+                item for item in self.vulnerabilities.items() if item[0] not in results
+            ]
             
-            for vuln_id, vuln_data in self.vulnerabilities.items():
-                print(f"  [{vuln_id}]...", end=" ", flush=True)
-                
-                policy, duration, success = self.generate_policy_with_rag(
-                    vuln_data, model
+            # Wall time of the run: requests overlap, so per-request latencies
+            # do not add up to it. Checkpoint lines carry the elapsed time so
+            # far, so a resumed run continues from the interrupted one
+            resumed_elapsed = max(
+                (info.get("elapsed_seconds", 0.0) for _, _, info in results.values()),
+                default=0.0
+            )
+            run_start = time.monotonic()
+            
+            # Up to `concurrency` generations in flight (Ollama serves them in
+            # parallel with OLLAMA_NUM_PARALLEL); each result is checkpointed
+            # as soon as it is consumed
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool, \
+                    open(policies_log, 'ab') as policies_out, \
+                    open(metadata_log, 'ab') as metadata_out:
+                generated = pool.map(
+                    lambda item: self.generate_policy_with_rag(*item, model),
+                    pending
                 )
-                
+                for (vuln_id, _), (policy, duration, success) in zip(pending, generated):
+                    print(f"  [{vuln_id}]...", end=" ", flush=True)
+                    
+                    # Track metadata
+                    process_info = {
+                        "vuln_id": vuln_id,
+                        "duration_seconds": round(duration, 2),
+                        "success": success
+                    }
+                    elapsed = resumed_elapsed + time.monotonic() - run_start
+                    self._append_jsonl(policies_out, {"vuln_id": vuln_id, "policy": policy})
+                    self._append_jsonl(metadata_out, {**process_info, "elapsed_seconds": round(elapsed, 2)})
+                    results[vuln_id] = (policy, duration, process_info)
+                    print("OK" if success else "FAILED")
+            
+            total_duration = resumed_elapsed + time.monotonic() - run_start
+            
+            # Consolidate in vulnerability order
+            total_latency = 0.0
+            for vuln_id in self.vulnerabilities:
+                policy, duration, process_info = results[vuln_id]
                 model_policies[vuln_id] = policy
-                total_duration += duration
-                
-                # Track metadata
-                process_info = {
-                    "vuln_id": vuln_id,
-                    "duration_seconds": round(duration, 2),
-                    "success": success
-                }
+                total_latency += duration
+                process_info.pop("elapsed_seconds", None)  # Checkpoint bookkeeping only
                 model_metadata["policy_ids_processed"].append(process_info)
-                
-                if success:
+                if process_info["success"]:
                     model_metadata["successful_generations"] += 1
-                    print("OK")
                 else:
                     model_metadata["failed_generations"] += 1
-                    print("FAILED")
-                
-                # Small delay between requests
-                time.sleep(0.5)
             
             # Update metadata
             model_metadata["total_duration_seconds"] = total_duration
@@ -345,19 +595,23 @@ Please consider the above framework context when generating the policy."""
                 if model_metadata["total_vulnerabilities"] > 0 else 0
             )
             model_metadata["avg_latency_seconds"] = (
-                total_duration / model_metadata["total_vulnerabilities"]
+                total_latency / model_metadata["total_vulnerabilities"]
                 if model_metadata["total_vulnerabilities"] > 0 else 0
             )
             
             # Save policies
             policies_file = os.path.join(output_dir, "policies.json")
-            with open(policies_file, 'w', encoding='utf-8') as f:
-                json.dump(model_policies, f, indent=2, ensure_ascii=False)
+            with open(policies_file, 'wb') as f:
+                f.write(orjson.dumps(model_policies, option=orjson.OPT_INDENT_2))
             
             # Save metadata
             metadata_file = os.path.join(output_dir, "metadata.json")
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(model_metadata, f, indent=2, ensure_ascii=False)
+            with open(metadata_file, 'wb') as f:
+                f.write(orjson.dumps(model_metadata, option=orjson.OPT_INDENT_2))
+            
+            # Final files are complete: the next run starts fresh
+            os.remove(policies_log)
+            os.remove(metadata_log)
             
             # Store for summary
             experiment_stats[model] = model_metadata
@@ -426,6 +680,17 @@ def main():
         default="http://localhost:11434",
         help="Ollama endpoint (default: http://localhost:11434)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Concurrent Ollama requests per model; match the server's OLLAMA_NUM_PARALLEL (default: 1)"
+    )
+    parser.add_argument(
+        "--onnx-int8",
+        action="store_true",
+        help="Embed with the int8 ONNX MiniLM on CPU-only hosts (pip install -r requirements-onnx.txt)"
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -450,7 +715,9 @@ def main():
         reference_policies_file="./policies/reference_policies.json",
         output_dir=args.output,
         pinecone_api_key=api_key,
-        limit_per_model=args.limit
+        limit_per_model=args.limit,
+        concurrency=args.concurrency,
+        onnx_int8_embedder=args.onnx_int8
     )
     
     # Run experiment
@@ -464,8 +731,8 @@ def main():
     
     # Save summary
     summary_file = os.path.join(args.output, "experiment_3_summary.json")
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+    with open(summary_file, 'wb') as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     
     print("\n" + "="*60)
     print("Experiment 3 Complete!")
@@ -1,10 +1,17 @@
 import streamlit as st
-import json
 import os
+import re
+import hashlib
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # Also accepts UTF-8 bytes
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
+# plotly is imported inside the figure helpers: only charts drawn load it
+
+from _fastscan import count_needles
 
 st.set_page_config(page_title="RAG Policy Analysis Dashboard", layout="wide")
 
@@ -19,6 +26,37 @@ EXPERIMENTS = ["1", "2", "3"]
 FEATURE_NAMES = ['Timeline', 'Responsibilities', 'Procedures', 'Monitoring', 'Compliance', 'Technical Details', 'Risk Assessment']
 FEATURE_KEYS = ['has_timeline', 'has_responsibilities', 'has_procedures', 'has_monitoring', 'has_compliance', 'has_technical_details', 'has_risk_assessment']
 
+# Comparison table: analysis field -> column name
+COMPARISON_COLUMNS = {
+    'word_count': "Word Count",
+    'total_citations': "Citations",
+    'completeness_score': "Completeness",
+    'section_count': "Sections",
+    'paragraph_count': "Paragraphs",
+}
+
+# Metadata overview columns; RAG columns map to their rag_config keys
+SUMMARY_COLUMNS = [
+    "Model", "Experiment", "Total Vulnerabilities", "Successful Generations",
+    "Failed Generations", "Completion Rate (%)", "Total Duration (min)",
+    "Avg Latency (s)", "Timeout (s)", "Start Time", "End Time"
+]
+RAG_SUMMARY_COLUMNS = {
+    "RAG Top-K": "top_k",
+    "RAG Chunk Size": "chunk_size",
+    "RAG Embedder": "embedder",
+    "RAG Vector Store": "vector_store",
+}
+
+# Metadata field -> keys it may be stored under, first present wins (the
+# generator writes the first, older experiment metadata the second)
+KEY_ALIASES = {
+    "total_vulnerabilities": ("total_vulnerabilities", "total_requests"),
+    "successful_generations": ("successful_generations", "successful_requests"),
+    "failed_generations": ("failed_generations", "failed_requests"),
+    "completion_rate_percent": ("completion_rate_percent", "completion_rate"),
+}
+
 # Experiment labels
 EXP1_LABEL = "Experiment 1: Standardized + RAG"
 EXP2_LABEL = "Experiment 2: Tailored + RAG"
@@ -37,30 +75,157 @@ CITATION_PATTERNS = {
     "HIPAA": ["HIPAA", "Health Insurance Portability"]
 }
 
+# Content feature -> keywords (lowercase substrings)
+FEATURE_KEYWORDS = {
+    'has_timeline': ['days', 'weeks', 'months', 'timeline', 'schedule', 'deadline'],
+    'has_responsibilities': ['responsible', 'accountability', 'owner', 'assigned'],
+    'has_procedures': ['procedure', 'steps', 'process', 'workflow'],
+    'has_monitoring': ['monitor', 'audit', 'review', 'assess', 'evaluate'],
+    'has_compliance': ['comply', 'compliance', 'regulation', 'requirement'],
+    'has_technical_details': ['configure', 'implement', 'deploy', 'install', 'patch'],
+    'has_risk_assessment': ['risk', 'threat', 'vulnerability', 'impact', 'likelihood'],
+}
+
+# Structure markers counted by analyze_policy_content
+PARAGRAPH_BREAK = '\n\n'
+SECTION_MARKER = '**'
+
+# JSON strings (escapes included) and structural characters, to index a
+# policies file without decoding it
+JSON_TOKEN_PATTERN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]', re.DOTALL)
+
+@st.cache_resource
+def _build_matchers():
+    """Keyword/citation matchers, built once per server process
+    
+    Feature keywords, citation patterns (lowercase) and the paragraph/section
+    markers are alternated longest first in a lookahead. It tries every
+    position, so one scan reports every needle occurrence: each match is the
+    longest needle starting there, which implies its prefixes.
+    """
+    needles = sorted(
+        {k for keywords in FEATURE_KEYWORDS.values() for k in keywords}
+        | {p.lower() for patterns in CITATION_PATTERNS.values() for p in patterns}
+        | {PARAGRAPH_BREAK, SECTION_MARKER},
+        key=lambda n: (-len(n), n)
+    )
+    needle_pattern = re.compile('(?=(' + '|'.join(map(re.escape, needles)) + '))')
+    needle_prefixes = {n: [m for m in needles if n.startswith(m)] for n in needles}
+    return needles, needle_pattern, needle_prefixes
+
+NEEDLES, NEEDLE_PATTERN, NEEDLE_PREFIXES = _build_matchers()
+
+# Part of the parquet analysis cache names, so cached analyses are redone when
+# the keyword/citation tables change; bump ANALYSIS_REVISION whenever
+# analyze_policies computes anything differently
+ANALYSIS_REVISION = 1
+ANALYSIS_VERSION = hashlib.sha1(
+    repr((ANALYSIS_REVISION, NEEDLES, FEATURE_KEYWORDS, CITATION_PATTERNS)).encode('utf-8')
+).hexdigest()[:8]
+
+@st.cache_resource
+def _needle_counter():
+    """count_needles, JIT-compiled (when numba is installed) once per server process"""
+    count_needles(["warm-up"], ["up"])
+    return count_needles
+
+@st.cache_data(show_spinner=False)
+def _load_json_file(path, mtime):
+    """Parse a JSON file once per modification time (mtime is part of the cache key)"""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+def _log_path(model, experiment, filename):
+    """Path of a file in the model/experiment log directory"""
+    return os.path.join(POLICY_DIR, "logs", model.replace(":", "_"), f"experiment_{experiment}", filename)
+
+def _log_file_mtime(model, experiment, filename):
+    """Modification time of a log file (None if missing)"""
+    path = _log_path(model, experiment, filename)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+def _log_file_mtime_ns(model, experiment, filename):
+    """Modification time of a log file in nanoseconds (None if missing)"""
+    path = _log_path(model, experiment, filename)
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+def _load_log_file(model, experiment, filename):
+    """Load a JSON file from the model/experiment log directory ({} if missing)"""
+    path = _log_path(model, experiment, filename)
+    if os.path.exists(path):
+        return _load_json_file(path, os.path.getmtime(path))
+    return {}
+
+def _read_log_file(model, experiment, filename):
+    """Parse a log file without going through the Streamlit cache ({} if missing)"""
+    path = _log_path(model, experiment, filename)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return json_loads(f.read())
+    return {}
+
 def load_policies(model, experiment):
     """Load policies for model and experiment"""
-    path = os.path.join(POLICY_DIR, "logs", model.replace(":", "_"), f"experiment_{experiment}", "policies.json")
+    return _load_log_file(model, experiment, "policies.json")
+
+@st.cache_data(show_spinner=False)
+def _policy_index(path, mtime):
+    """Byte span (offset, length) of every policy in a policies file, by CVE
+    
+    Walks the raw bytes once: whole strings are skipped by JSON_TOKEN_PATTERN,
+    so only the object structure is visited and no policy is decoded.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    index = {}
+    depth = 0
+    key = start = None
+    for token in JSON_TOKEN_PATTERN.finditer(data):
+        char = token.group()[:1]
+        if char in b'{[':
+            depth += 1
+        elif depth == 1 and char == b'"' and key is None:
+            key = token.group()
+        elif depth == 1 and char == b':':
+            start = token.end()
+        elif depth == 1 and char in b',}':
+            # End of the current member's value
+            if key is not None:
+                index[json_loads(key)] = (start, token.start() - start)
+                key = None
+        if char in b']}':
+            depth -= 1
+    return index
+
+def list_cves(model, experiment):
+    """IDs of the policies generated for model and experiment"""
+    path = _log_path(model, experiment, "policies.json")
     if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+        return list(_policy_index(path, os.path.getmtime(path)))
+    return []
+
+def load_policy(model, experiment, cve):
+    """Load a single policy for model and experiment (None if absent)"""
+    path = _log_path(model, experiment, "policies.json")
+    if os.path.exists(path):
+        span = _policy_index(path, os.path.getmtime(path)).get(cve)
+        if span is not None:
+            # Only this policy's bytes are read and decoded
+            offset, length = span
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                return json_loads(f.read(length))
+    return None
 
 def load_metadata(model, experiment):
     """Load metadata for model and experiment"""
-    path = os.path.join(POLICY_DIR, "logs", model.replace(":", "_"), f"experiment_{experiment}", "metadata.json")
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return _load_log_file(model, experiment, "metadata.json")
 
 def load_experiment_metadata(model, experiment):
     """Load experiment metadata for model and experiment"""
-    path = os.path.join(POLICY_DIR, "logs", model.replace(":", "_"), f"experiment_{experiment}", "experiment_metadata.json")
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return _load_log_file(model, experiment, "experiment_metadata.json")
 
+@st.cache_data(show_spinner=False, max_entries=4096)
 def analyze_policy_content(policy_text):
     """Analyze policy content for various metrics"""
     if not policy_text:
@@ -68,28 +233,37 @@ def analyze_policy_content(policy_text):
     
     text_lower = policy_text.lower()
     
+    # Single scan for every keyword, citation pattern and structure marker;
+    # occurrences of the same needle are counted without overlap, as str.count does
+    counts = dict.fromkeys(NEEDLES, 0)
+    next_start = dict.fromkeys(NEEDLES, 0)
+    for match in NEEDLE_PATTERN.finditer(text_lower):
+        start = match.start()
+        for needle in NEEDLE_PREFIXES[match.group(1)]:
+            if start >= next_start[needle]:
+                counts[needle] += 1
+                next_start[needle] = start + len(needle)
+    
     # Basic metrics
     word_count = len(policy_text.split())
     char_count = len(policy_text)
-    paragraph_count = policy_text.count('\n\n') + 1
-    section_count = policy_text.count('**')
+    paragraph_count = counts[PARAGRAPH_BREAK] + 1
+    section_count = counts[SECTION_MARKER]
     
     # Citation analysis
     citations = {}
+    total_citations = 0
     for framework, patterns in CITATION_PATTERNS.items():
-        count = sum(policy_text.upper().count(pattern.upper()) for pattern in patterns)
-        citations[framework] = count
+        citations[framework] = sum(counts[pattern.lower()] for pattern in patterns)
+        total_citations += citations[framework]
     
-    # Content analysis
-    has_timeline = any(keyword in text_lower for keyword in ['days', 'weeks', 'months', 'timeline', 'schedule', 'deadline'])
-    has_responsibilities = any(keyword in text_lower for keyword in ['responsible', 'accountability', 'owner', 'assigned'])
-    has_procedures = any(keyword in text_lower for keyword in ['procedure', 'steps', 'process', 'workflow'])
-    has_monitoring = any(keyword in text_lower for keyword in ['monitor', 'audit', 'review', 'assess', 'evaluate'])
-    has_compliance = any(keyword in text_lower for keyword in ['comply', 'compliance', 'regulation', 'requirement'])
-    
-    # Technical depth indicators
-    has_technical_details = any(keyword in text_lower for keyword in ['configure', 'implement', 'deploy', 'install', 'patch'])
-    has_risk_assessment = any(keyword in text_lower for keyword in ['risk', 'threat', 'vulnerability', 'impact', 'likelihood'])
+    # Content analysis (incl. technical depth indicators): one bit per
+    # feature, in FEATURE_KEYS order
+    feature_mask = 0
+    for bit, keywords in enumerate(FEATURE_KEYWORDS.values()):
+        if any(counts[keyword] for keyword in keywords):
+            feature_mask |= 1 << bit
+    features = {feature: bool(feature_mask >> bit & 1) for bit, feature in enumerate(FEATURE_KEYWORDS)}
     
     return {
         'word_count': word_count,
@@ -97,64 +271,244 @@ def analyze_policy_content(policy_text):
         'paragraph_count': paragraph_count,
         'section_count': section_count,
         'citations': citations,
-        'total_citations': sum(citations.values()),
-        'has_timeline': has_timeline,
-        'has_responsibilities': has_responsibilities,
-        'has_procedures': has_procedures,
-        'has_monitoring': has_monitoring,
-        'has_compliance': has_compliance,
-        'has_technical_details': has_technical_details,
-        'has_risk_assessment': has_risk_assessment,
-        'completeness_score': sum([has_timeline, has_responsibilities, has_procedures, has_monitoring, has_compliance, has_technical_details, has_risk_assessment])
+        'total_citations': total_citations,
+        **features,
+        'completeness_score': sum(features.values()),
+        'feature_mask': feature_mask
     }
 
+def analyze_policies(policies):
+    """Analyze every policy of an experiment at once (one row per CVE)
+    
+    Same metrics as analyze_policy_content: every needle is counted in every
+    policy by a single count_needles call. Empty policies get an all-NaN row.
+    """
+    texts = pd.Series(policies, dtype=object)
+    present = texts[texts.fillna('').astype(bool)]
+    counts = _needle_counter()(present.str.lower().tolist(), NEEDLES)
+    column = {needle: i for i, needle in enumerate(NEEDLES)}
+    
+    def needle_counts(needles):
+        return counts[:, [column[needle.lower()] for needle in needles]]
+    
+    df = pd.DataFrame({
+        'word_count': present.str.split().str.len(),
+        'char_count': present.str.len(),
+        'paragraph_count': counts[:, column[PARAGRAPH_BREAK]] + 1,
+        'section_count': counts[:, column[SECTION_MARKER]],
+        'total_citations': needle_counts(
+            [pattern for patterns in CITATION_PATTERNS.values() for pattern in patterns]
+        ).sum(axis=1),
+    }, index=present.index)
+    for feature, keywords in FEATURE_KEYWORDS.items():
+        df[feature] = needle_counts(keywords).any(axis=1)
+    df['completeness_score'] = df[list(FEATURE_KEYWORDS)].sum(axis=1)
+    df['feature_mask'] = df[list(FEATURE_KEYWORDS)].to_numpy() @ (1 << np.arange(len(FEATURE_KEYWORDS)))
+    
+    df = df.reindex(texts.index)
+    df['cve'] = df.index
+    return df.reset_index(drop=True)
+
+def _analysis_cache_path(model, experiment, mtime_ns):
+    """Parquet file holding the analysis of one version of a policies file"""
+    return os.path.join(
+        POLICY_DIR, ".cache",
+        f"{model.replace(':', '_')}_{experiment}_{mtime_ns}_{ANALYSIS_VERSION}.parquet"
+    )
+
+def _write_analysis_cache(path, df):
+    """Persist an analysis frame, replacing those of older policies or
+    analysis versions
+    
+    Best effort: without pyarrow, or on a read-only disk, nothing is written.
+    """
+    directory = os.path.dirname(path)
+    prefix = os.path.basename(path).rsplit('_', 2)[0] + '_'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        for entry in os.scandir(directory):
+            if entry.name.startswith(prefix) and entry.name.endswith('.parquet') and entry.path != path:
+                os.remove(entry.path)
+    except Exception as e:
+        print(f"Could not write analysis cache {path}: {e}")
+
+def refresh_analysis_cache(model, experiment):
+    """Write the parquet analysis of the current policies if it is missing
+    
+    Returns the parquet path (None without policies). Used by build_cache.py
+    to prepare the aggregate page offline.
+    """
+    mtime_ns = _log_file_mtime_ns(model, experiment, "policies.json")
+    if mtime_ns is None:
+        return None
+    cache_path = _analysis_cache_path(model, experiment, mtime_ns)
+    if not os.path.exists(cache_path):
+        policies = _read_log_file(model, experiment, "policies.json")
+        if not policies:
+            return None
+        _write_analysis_cache(cache_path, analyze_policies(policies))
+    return cache_path
+
+@st.cache_data(show_spinner=False)
+def _load_analyses(model, experiments, mtimes):
+    """Analysis frame of each experiment that has policies
+    
+    mtimes (policies files' st_mtime_ns) key this cache and the parquet files
+    that keep each analysis across restarts: policies are only decoded and
+    analyzed when no parquet file matches. Files are read concurrently
+    (worker threads bypass the per-file cache: this whole result is cached).
+    """
+    def read(exp, mtime_ns):
+        if mtime_ns is None:
+            return None, {}
+        cache_path = _analysis_cache_path(model, exp, mtime_ns)
+        if os.path.exists(cache_path):
+            try:
+                return pd.read_parquet(cache_path), None
+            except Exception:
+                pass  # Unreadable (e.g. no pyarrow): analyze again
+        return None, _read_log_file(model, exp, "policies.json")
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        loaded = list(pool.map(read, experiments, mtimes))
+    
+    analyses = {}
+    for exp, mtime_ns, (df, policies) in zip(experiments, mtimes, loaded):
+        if df is None and policies:
+            df = analyze_policies(policies)
+            _write_analysis_cache(_analysis_cache_path(model, exp, mtime_ns), df)
+        if df is not None:
+            analyses[exp] = df
+    return analyses
+
+def load_experiments_analyses(model, experiments):
+    """Analyze policies for model and each experiment (experiment -> analysis frame)"""
+    experiments = tuple(experiments)
+    mtimes = tuple(_log_file_mtime_ns(model, exp, "policies.json") for exp in experiments)
+    return _load_analyses(model, experiments, mtimes)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def make_figure(kind, df, **kwargs):
+    """plotly.express chart of the given kind ('bar', 'histogram'), rebuilt only when its inputs change"""
+    import plotly.express as px
+    fig = getattr(px, kind)(df, **kwargs)
+    # Constant uirevision: zoom/legend state survives reruns that resend the chart
+    fig.update_layout(uirevision=kwargs.get('title'))
+    return fig
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def overlay_histogram(columns, title, bins=30):
+    """Overlaid histograms, one trace per label (columns: label -> values)
+    
+    Binned here on edges shared by all labels, so only the bin counts are
+    sent to the browser; missing values are left out. Integer values (counts)
+    get edges at half-integers, each bin covering a whole number of values,
+    so small counts get one bar per value.
+    """
+    import plotly.graph_objects as go
+    columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    columns = {name: values[~np.isnan(values)] for name, values in columns.items()}
+    combined = np.concatenate(list(columns.values()))
+    if combined.size and np.array_equal(combined, np.round(combined)):
+        lo, hi = combined.min(), combined.max()
+        width = max(1, int(np.ceil((hi - lo + 1) / bins)))
+        edges = lo - 0.5 + width * np.arange(int((hi - lo) // width) + 2)
+    else:
+        edges = np.histogram_bin_edges(combined, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure()
+    for name, values in columns.items():
+        counts, _ = np.histogram(values, bins=edges)
+        fig.add_trace(go.Bar(x=centers, y=counts, width=np.diff(edges), name=name, opacity=0.7))
+    fig.update_layout(title=title, barmode='overlay', bargap=0, uirevision=title)
+    return fig
+
+def _meta_value(data, field, default=0):
+    """Metadata field under the first of its KEY_ALIASES present in data"""
+    return next((data[key] for key in KEY_ALIASES.get(field, (field,)) if key in data), default)
+
+def _normalize_meta(model, exp, data):
+    """Metadata overview record for one run (RAG fields NaN without a RAG config)"""
+    record = {
+        "Model": model,
+        "Experiment": f"Experiment {exp}",
+        "Total Vulnerabilities": _meta_value(data, "total_vulnerabilities"),
+        "Successful Generations": _meta_value(data, "successful_generations"),
+        "Failed Generations": _meta_value(data, "failed_generations"),
+        "Completion Rate (%)": _meta_value(data, "completion_rate_percent"),
+        "Total Duration (min)": round(data.get("total_duration_seconds", 0) / 60, 2),
+        "Avg Latency (s)": round(data.get("avg_latency_seconds", 0), 2),
+        "Timeout (s)": data.get("timeout_seconds", 0),
+        "Start Time": data.get("start_time", "N/A"),
+        "End Time": data.get("end_time", "N/A"),
+    }
+    if "rag_config" in data:
+        record.update({column: data["rag_config"].get(key, "N/A") for column, key in RAG_SUMMARY_COLUMNS.items()})
+    else:
+        record.update(dict.fromkeys(RAG_SUMMARY_COLUMNS, np.nan))
+    return record
+
+@st.cache_data(show_spinner=False)
+def build_metadata_summary_df(mtimes):
+    """Summary row per model/experiment with metadata (None if there is none)
+    
+    mtimes only keys the cache: it changes whenever a metadata file does.
+    """
+    # Load metadata for all models and experiments, files read concurrently
+    # (worker threads bypass the per-file cache: this whole result is cached).
+    # Use the more comprehensive metadata: the experiment metadata file is
+    # only read when there is none
+    def load_run(model, exp):
+        return (
+            _read_log_file(model, exp, "metadata.json")
+            or _read_log_file(model, exp, "experiment_metadata.json")
+        )
+    
+    runs = [(model, exp) for model in MODELS for exp in EXPERIMENTS]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        loaded = list(pool.map(lambda run: load_run(*run), runs))
+    
+    metadata = [(model, exp, data) for (model, exp), data in zip(runs, loaded) if data]
+    
+    if not metadata:
+        return None
+    
+    # Convert to DataFrame (RAG columns only if some run has a RAG config); the
+    # low-cardinality keys become ordered categoricals (canonical order, only
+    # the values present)
+    df = pd.DataFrame.from_records(
+        [_normalize_meta(*run) for run in metadata],
+        columns=SUMMARY_COLUMNS + list(RAG_SUMMARY_COLUMNS)
+    )
+    if not any("rag_config" in data for _, _, data in metadata):
+        df = df.drop(columns=list(RAG_SUMMARY_COLUMNS))
+    df["Model"] = df["Model"].astype(
+        pd.CategoricalDtype(MODELS, ordered=True)
+    ).cat.remove_unused_categories()
+    df["Experiment"] = df["Experiment"].astype(
+        pd.CategoricalDtype([f"Experiment {exp}" for exp in EXPERIMENTS], ordered=True)
+    ).cat.remove_unused_categories()
+    return df
+
 def show_metadata_dashboard():
     """Display metadata dashboard"""
     st.title("Chart Experiment Metadata Dashboard")
     
-    # Load metadata for all models and experiments
-    metadata_summary = []
+    mtimes = tuple(
+        _log_file_mtime(model, exp, filename)
+        for model in MODELS
+        for exp in EXPERIMENTS
+        for filename in ("metadata.json", "experiment_metadata.json")
+    )
+    df = build_metadata_summary_df(mtimes)
     
-    for model in MODELS:
-        for exp in EXPERIMENTS:
-            meta = load_metadata(model, exp)
-            exp_meta = load_experiment_metadata(model, exp)
-            
-            if meta or exp_meta:
-                # Use the more comprehensive metadata if available
-                data = meta if meta else exp_meta
-                
-                summary = {
-                    "Model": model,
-                    "Experiment": f"Experiment {exp}",
-                    "Total Vulnerabilities": data.get("total_vulnerabilities", data.get("total_requests", 0)),
-                    "Successful Generations": data.get("successful_generations", data.get("successful_requests", 0)),
-                    "Failed Generations": data.get("failed_generations", data.get("failed_requests", 0)),
-                    "Completion Rate (%)": data.get("completion_rate_percent", data.get("completion_rate", 0)),
-                    "Total Duration (min)": round(data.get("total_duration_seconds", 0) / 60, 2),
-                    "Avg Latency (s)": round(data.get("avg_latency_seconds", 0), 2),
-                    "Timeout (s)": data.get("timeout_seconds", 0),
-                    "Start Time": data.get("start_time", "N/A"),
-                    "End Time": data.get("end_time", "N/A")
-                }
-                
-                if "rag_config" in data:
-                    summary.update({
-                        "RAG Top-K": data["rag_config"].get("top_k", "N/A"),
-                        "RAG Chunk Size": data["rag_config"].get("chunk_size", "N/A"),
-                        "RAG Embedder": data["rag_config"].get("embedder", "N/A"),
-                        "RAG Vector Store": data["rag_config"].get("vector_store", "N/A")
-                    })
-                
-                metadata_summary.append(summary)
-    
-    if not metadata_summary:
+    if df is None:
         st.error("No metadata found")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(metadata_summary)
-    
     # Overview metrics
     st.subheader("Overview Metrics")
     col1, col2, col3, col4 = st.columns(4)
@@ -186,7 +540,8 @@ def show_metadata_dashboard():
     
     with col1:
         # Completion rate comparison
-        fig_completion = px.bar(
+        fig_completion = make_figure(
+            'bar',
             df, 
             x="Model", 
             y="Completion Rate (%)", 
@@ -198,7 +553,8 @@ def show_metadata_dashboard():
     
     with col2:
         # Latency comparison
-        fig_latency = px.bar(
+        fig_latency = make_figure(
+            'bar',
             df, 
             x="Model", 
             y="Avg Latency (s)", 
@@ -234,23 +590,71 @@ def show_policy_comparison():
         st.warning("Please select at least one experiment")
         return
     
-    # Load experiments
-    policies = {}
+    # Load experiments' policy IDs; only the selected CVE's policy is decoded
+    policy_ids = {}
     for exp in selected_experiments:
-        policies[exp] = load_policies(selected_model, exp)
+        policy_ids[exp] = set(list_cves(selected_model, exp))
     
     # Check if any policies exist
-    if not any(policies.values()):
+    if not any(policy_ids.values()):
         st.error("No policies found. Run generator first.")
         return
     
     # Get CVE list from all selected experiments
-    all_cves = set()
-    for exp_policies in policies.values():
-        all_cves.update(exp_policies.keys())
+    cves = sorted(set().union(*policy_ids.values()))
+    show_cve_comparison(selected_model, selected_experiments, policy_ids, cves)
+
+def _render_experiment_panel(label, policy, analysis):
+    """One experiment's column of the comparison: metrics, features and the policy"""
+    st.markdown(f"### {label}")
+    
+    if policy is None:
+        st.warning("No policy generated")
+        return
     
-    cves = sorted(all_cves)
-    selected_cve = st.sidebar.selectbox("Vulnerability", cves)
+    # Metrics, as a single table
+    with st.expander("Policy Metrics", expanded=False):
+        metrics_df = pd.DataFrame({
+            "Metric": ["Word Count", "Sections", "Total Citations", "Paragraphs", "Completeness Score"],
+            "Value": [
+                str(analysis.get('word_count', 0)),
+                str(analysis.get('section_count', 0)),
+                str(analysis.get('total_citations', 0)),
+                str(analysis.get('paragraph_count', 0)),
+                f"{analysis.get('completeness_score', 0)}/7",
+            ]
+        })
+        st.dataframe(metrics_df, hide_index=True, use_container_width=True)
+        
+        # Citation breakdown and content features, one element each (lines
+        # joined with markdown hard breaks)
+        st.markdown("**Citations by Framework:**")
+        citations = analysis.get('citations', {})
+        cited = [f"• {framework}: {count}" for framework, count in citations.items() if count > 0]
+        if cited:
+            st.markdown("  \n".join(cited))
+        
+        st.markdown("**Content Features:**")
+        st.markdown("  \n".join(
+            f"[{'OK' if analysis.get(feature, False) else 'X'}] {name}"
+            for feature, name in zip(FEATURE_KEYS, FEATURE_NAMES)
+        ))
+    
+    # Policy content
+    with st.expander("Policy Content", expanded=True):
+        st.markdown(policy)
+
+# Fragment: picking another vulnerability reruns only this part of the page
+# (fragments cannot add sidebar widgets, so the picker sits in the page body)
+@st.fragment
+def show_cve_comparison(selected_model, selected_experiments, policy_ids, cves):
+    """Display the selected vulnerability's policies side by side"""
+    selected_cve = st.selectbox("Vulnerability", cves)
+    policies = {
+        exp: load_policy(selected_model, exp, selected_cve)
+        for exp in selected_experiments
+        if selected_cve in policy_ids[exp]
+    }
     
     # Display
     st.subheader(f"{selected_model} - {selected_cve}")
@@ -265,68 +669,32 @@ def show_policy_comparison():
     # Create columns based on selected experiments
     columns = st.columns(len(selected_experiments))
     
-    analyses = {}
+    # Analyse each selected policy once for every section below
+    analyses = {exp: analyze_policy_content(policy) for exp, policy in policies.items()}
     
-    for idx, (exp, col) in enumerate(zip(selected_experiments, columns)):
+    for exp, col in zip(selected_experiments, columns):
         with col:
-            st.markdown(f"### {exp_labels[exp]}")
-            
-            if selected_cve in policies[exp]:
-                policy = policies[exp][selected_cve]
-                analysis = analyze_policy_content(policy)
-                analyses[exp] = analysis
-                
-                # Metrics
-                with st.expander("Policy Metrics", expanded=False):
-                    mcol1, mcol2 = st.columns(2)
-                    with mcol1:
-                        st.metric("Word Count", analysis.get('word_count', 0))
-                        st.metric("Sections", analysis.get('section_count', 0))
-                        st.metric("Total Citations", analysis.get('total_citations', 0))
-                    with mcol2:
-                        st.metric("Paragraphs", analysis.get('paragraph_count', 0))
-                        st.metric("Completeness Score", f"{analysis.get('completeness_score', 0)}/7")
-                        
-                    # Citation breakdown
-                    st.markdown("**Citations by Framework:**")
-                    citations = analysis.get('citations', {})
-                    for framework, count in citations.items():
-                        if count > 0:
-                            st.write(f"• {framework}: {count}")
-                    
-                    # Content features
-                    st.markdown("**Content Features:**")
-                    for feature, name in zip(FEATURE_KEYS, FEATURE_NAMES):
-                        icon = "OK" if analysis.get(feature, False) else "X"
-                        st.write(f"[{icon}] {name}")
-                
-                # Policy content
-                with st.expander("Policy Content", expanded=True):
-                    st.markdown(policy)
-            else:
-                st.warning("No policy generated")
+            _render_experiment_panel(exp_labels[exp], policies.get(exp), analyses.get(exp))
     
     # Detailed Comparison (only if 2+ experiments selected)
     if len(selected_experiments) >= 2:
         st.markdown("---")
         st.subheader("Detailed Comparison Analysis")
         
-        # Build comparison data
-        comparison_data = []
-        for exp in selected_experiments:
-            if selected_cve in policies[exp]:
-                analysis = analyses.get(exp, analyze_policy_content(policies[exp][selected_cve]))
-                comparison_data.append({
-                    "Experiment": exp_labels[exp],
-                    "Word Count": analysis.get('word_count', 0),
-                    "Citations": analysis.get('total_citations', 0),
-                    "Completeness": analysis.get('completeness_score', 0),
-                    "Sections": analysis.get('section_count', 0),
-                    "Paragraphs": analysis.get('paragraph_count', 0)
-                })
+        # One row per experiment with this CVE; the sections below slice it
+        analyses_df = pd.DataFrame(
+            list(analyses.values()),
+            index=pd.Index([exp_labels[exp] for exp in analyses], name="Experiment")
+        )
         
-        if comparison_data:
-            comp_df = pd.DataFrame(comparison_data)
+        if analyses:
+            comp_df = (
+                analyses_df.reindex(columns=list(COMPARISON_COLUMNS))
+                .fillna(0)
+                .astype(int)
+                .rename(columns=COMPARISON_COLUMNS)
+                .reset_index()
+            )
             st.dataframe(comp_df, use_container_width=True)
             
             # Comparison charts
@@ -334,7 +702,8 @@ def show_policy_comparison():
             
             with col1:
                 # Word count comparison
-                fig_words = px.bar(
+                fig_words = make_figure(
+                    'bar',
                     comp_df,
                     x="Experiment",
                     y="Word Count",
@@ -345,7 +714,8 @@ def show_policy_comparison():
             
             with col2:
                 # Citations comparison
-                fig_cit = px.bar(
+                fig_cit = make_figure(
+                    'bar',
                     comp_df,
                     x="Experiment",
                     y="Citations",
@@ -358,24 +728,25 @@ def show_policy_comparison():
         if len(selected_experiments) >= 2:
             st.markdown("### Citation Framework Comparison")
             
-            frameworks = list(CITATION_PATTERNS.keys())
-            citation_comparison = []
-            
-            for exp in selected_experiments:
-                if selected_cve in policies[exp]:
-                    analysis = analyses.get(exp, analyze_policy_content(policies[exp][selected_cve]))
-                    for framework in frameworks:
-                        count = analysis.get('citations', {}).get(framework, 0)
-                        if count > 0:
-                            citation_comparison.append({
-                                'Framework': framework,
-                                'Experiment': exp_labels[exp],
-                                'Count': count
-                            })
+            # Long form (experiment, framework, count) for non-zero counts
+            citations = analyses_df.reindex(columns=['citations'])['citations']
+            cit_df = (
+                pd.DataFrame(
+                    [c if isinstance(c, dict) else {} for c in citations],
+                    index=citations.index,
+                    columns=pd.Index(list(CITATION_PATTERNS), name='Framework')
+                )
+                .fillna(0)
+                .astype(int)
+                .stack()
+                .rename('Count')
+                .reset_index()
+            )
+            cit_df = cit_df.loc[cit_df['Count'] > 0, ['Framework', 'Experiment', 'Count']].reset_index(drop=True)
             
-            if citation_comparison:
-                cit_df = pd.DataFrame(citation_comparison)
-                fig_citations = px.bar(
+            if not cit_df.empty:
+                fig_citations = make_figure(
+                    'bar',
                     cit_df,
                     x='Framework',
                     y='Count',
@@ -388,16 +759,13 @@ def show_policy_comparison():
         # Content feature comparison
         st.markdown("### Content Features Comparison")
         
-        feature_comparison = []
-        for feature, name in zip(FEATURE_KEYS, FEATURE_NAMES):
-            row = {'Feature': name}
-            for exp in selected_experiments:
-                if selected_cve in policies[exp]:
-                    analysis = analyses.get(exp, analyze_policy_content(policies[exp][selected_cve]))
-                    row[exp_labels[exp]] = 'YES' if analysis.get(feature, False) else 'NO'
-            feature_comparison.append(row)
-        
-        feature_df = pd.DataFrame(feature_comparison)
+        flags = analyses_df.reindex(columns=FEATURE_KEYS).fillna(False).astype(bool)
+        feature_df = (
+            flags.T.replace({True: 'YES', False: 'NO'})
+            .set_axis(pd.Index(FEATURE_NAMES, name='Feature'))
+            .rename_axis(columns=None)
+            .reset_index()
+        )
         st.dataframe(feature_df, use_container_width=True)
 
 def show_individual_metadata():
@@ -409,33 +777,33 @@ def show_individual_metadata():
     selected_model = st.sidebar.selectbox("Model", MODELS, key="individual")
     selected_experiment = st.sidebar.selectbox("Experiment", EXPERIMENTS, key="individual_exp")
     
-    # Load metadata
-    metadata = load_metadata(selected_model, selected_experiment)
-    exp_metadata = load_experiment_metadata(selected_model, selected_experiment)
+    # Load metadata, using the more comprehensive metadata if available (the
+    # experiment metadata is only read without it)
+    data = (
+        load_metadata(selected_model, selected_experiment)
+        or load_experiment_metadata(selected_model, selected_experiment)
+    )
     
-    if not metadata and not exp_metadata:
+    if not data:
         st.error(f"No metadata found for {selected_model} - Experiment {selected_experiment}")
         return
     
-    # Use the more comprehensive metadata
-    data = metadata if metadata else exp_metadata
-    
     st.subheader(f"{selected_model} - Experiment {selected_experiment}")
     
     # Basic info
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Vulnerabilities", data.get("total_vulnerabilities", data.get("total_requests", 0)))
-        st.metric("Success Rate", f"{data.get('completion_rate_percent', data.get('completion_rate', 0)):.1f}%")
+        st.metric("Total Vulnerabilities", _meta_value(data, "total_vulnerabilities"))
+        st.metric("Success Rate", f"{_meta_value(data, 'completion_rate_percent'):.1f}%")
     
     with col2:
         st.metric("Processing Time", f"{data.get('total_duration_seconds', 0)/60:.1f} min")
         st.metric("Average Latency", f"{data.get('avg_latency_seconds', 0):.2f}s")
     
     with col3:
-        st.metric("Successful", data.get("successful_generations", data.get("successful_requests", 0)))
-        st.metric("Failed", data.get("failed_generations", data.get("failed_requests", 0)))
+        st.metric("Successful", _meta_value(data, "successful_generations"))
+        st.metric("Failed", _meta_value(data, "failed_generations"))
     
     # RAG Configuration (if available)
     if "rag_config" in data:
@@ -476,28 +844,27 @@ def show_individual_metadata():
     if "policy_ids_processed" in data:
         st.subheader("Processing Details")
         
-        # Convert to DataFrame for better display
-        process_data = []
-        for item in data["policy_ids_processed"]:
-            process_data.append({
-                "Vulnerability ID": item["vuln_id"],
-                "Duration (s)": round(item["duration_seconds"], 2),
-                "Status": "Success" if item["success"] else "Failed"
-            })
-        
-        df_process = pd.DataFrame(process_data)
+        # Columns taken straight from the processed items
+        df_process = pd.DataFrame.from_records(
+            data["policy_ids_processed"],
+            columns=["vuln_id", "duration_seconds", "success"]
+        ).rename(columns={"vuln_id": "Vulnerability ID", "duration_seconds": "Duration (s)"})
+        df_process["Duration (s)"] = df_process["Duration (s)"].round(2)
+        df_process["Status"] = np.where(df_process.pop("success"), "Success", "Failed")
+        durations = df_process["Duration (s)"]
         
         # Statistics
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Min Duration", f"{df_process['Duration (s)'].min():.2f}s")
+            st.metric("Min Duration", f"{durations.min():.2f}s")
         with col2:
-            st.metric("Max Duration", f"{df_process['Duration (s)'].max():.2f}s")
+            st.metric("Max Duration", f"{durations.max():.2f}s")
         with col3:
-            st.metric("Std Duration", f"{df_process['Duration (s)'].std():.2f}s")
+            st.metric("Std Duration", f"{durations.std():.2f}s")
         
         # Duration distribution
-        fig_hist = px.histogram(
+        fig_hist = make_figure(
+            'histogram',
             df_process, 
             x="Duration (s)", 
             title="Processing Duration Distribution",
@@ -524,20 +891,8 @@ def show_aggregate_analysis():
         st.warning("Please select at least one experiment")
         return
     
-    # Load all policies for selected experiments
-    all_analyses = {}
-    
-    for exp in selected_experiments:
-        policies = load_policies(selected_model, exp)
-        
-        if policies:
-            exp_analyses = []
-            for cve, policy in policies.items():
-                analysis = analyze_policy_content(policy)
-                analysis['cve'] = cve
-                exp_analyses.append(analysis)
-            
-            all_analyses[exp] = pd.DataFrame(exp_analyses) if exp_analyses else pd.DataFrame()
+    # Analyze all policies for selected experiments
+    all_analyses = load_experiments_analyses(selected_model, selected_experiments)
     
     if not all_analyses or all(df.empty for df in all_analyses.values()):
         st.error("No policies found for selected experiments")
@@ -572,44 +927,41 @@ def show_aggregate_analysis():
         
         with col1:
             # Word count distribution
-            fig_words = go.Figure()
-            for exp in selected_experiments:
-                if exp in all_analyses and not all_analyses[exp].empty:
-                    fig_words.add_trace(go.Histogram(
-                        x=all_analyses[exp]['word_count'],
-                        name=exp_labels[exp],
-                        opacity=0.7
-                    ))
-            fig_words.update_layout(title='Word Count Distribution', barmode='overlay')
+            fig_words = overlay_histogram(
+                {
+                    exp_labels[exp]: all_analyses[exp]['word_count']
+                    for exp in selected_experiments
+                    if exp in all_analyses and not all_analyses[exp].empty
+                },
+                'Word Count Distribution'
+            )
             st.plotly_chart(fig_words, use_container_width=True)
             
         with col2:
             # Citation distribution
-            fig_citations = go.Figure()
-            for exp in selected_experiments:
-                if exp in all_analyses and not all_analyses[exp].empty:
-                    fig_citations.add_trace(go.Histogram(
-                        x=all_analyses[exp]['total_citations'],
-                        name=exp_labels[exp],
-                        opacity=0.7
-                    ))
-            fig_citations.update_layout(title='Total Citations Distribution', barmode='overlay')
+            fig_citations = overlay_histogram(
+                {
+                    exp_labels[exp]: all_analyses[exp]['total_citations']
+                    for exp in selected_experiments
+                    if exp in all_analyses and not all_analyses[exp].empty
+                },
+                'Total Citations Distribution'
+            )
             st.plotly_chart(fig_citations, use_container_width=True)
         
         # Feature adoption rates
         st.subheader("Feature Adoption Rates")
         
-        adoption_data = []
-        for feature, name in zip(FEATURE_KEYS, FEATURE_NAMES):
-            row = {'Feature': name}
-            for exp in selected_experiments:
-                if exp in all_analyses and not all_analyses[exp].empty:
-                    df = all_analyses[exp]
-                    adoption_rate = (df[feature].sum() / len(df)) * 100 if len(df) > 0 else 0
-                    row[exp_labels[exp]] = f"{adoption_rate:.1f}%"
-            adoption_data.append(row)
-        
-        adoption_df = pd.DataFrame(adoption_data)
+        # Share of policies with each feature, one column reduction per
+        # experiment (empty policies count, as policies without features)
+        adoption_rates = pd.DataFrame({
+            exp_labels[exp]: all_analyses[exp][FEATURE_KEYS].sum() / len(all_analyses[exp]) * 100
+            for exp in selected_experiments
+            if exp in all_analyses and not all_analyses[exp].empty
+        })
+        adoption_df = adoption_rates.apply(lambda rates: rates.map("{:.1f}%".format))
+        adoption_df.insert(0, 'Feature', FEATURE_NAMES)
+        adoption_df = adoption_df.reset_index(drop=True)
         st.dataframe(adoption_df, use_container_width=True)
 
 def main():